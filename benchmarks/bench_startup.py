@@ -0,0 +1,65 @@
+"""
+Cold-start benchmark for the Streamlit app.
+
+Each sample runs in a fresh Python process: the app script is executed once
+with Streamlit's AppTest (a headless first paint of the chosen page), and the
+script's wall time plus the heavy modules it pulled in are reported. The
+Parquet data cache is assumed warm, so this measures imports and page code,
+not the Excel parse.
+
+    python benchmarks/bench_startup.py --page Home --samples 5
+    python benchmarks/bench_startup.py --script old_main.py   # compare another version
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['scipy.optimize', 'altair', 'matplotlib']
+
+_CHILD = r'''
+import sys, time, json
+from streamlit.testing.v1 import AppTest
+script, page = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+at = AppTest.from_file(script, default_timeout=300)
+at.run()
+if page != "Home":
+    at.sidebar.radio[0].set_value(page).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "first_paint_s": elapsed,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+def sample(script, page):
+    out = subprocess.run([sys.executable, '-c', _CHILD, script, page], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold first-paint time of the Streamlit app.")
+    parser.add_argument('--script', default=os.path.join(ROOT, 'main.py'))
+    parser.add_argument('--page', default='Home')
+    parser.add_argument('--samples', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    runs = [sample(os.path.abspath(args.script), args.page) for _ in range(args.samples)]
+    times = [r['first_paint_s'] for r in runs]
+    print(json.dumps({
+        'script': os.path.relpath(args.script, ROOT),
+        'page': args.page,
+        'samples': args.samples,
+        'first_paint_median_s': round(statistics.median(times), 4),
+        'first_paint_min_s': round(min(times), 4),
+        'heavy_modules_loaded': runs[0]['loaded'],
+        'errors': runs[0]['errors'],
+    }, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
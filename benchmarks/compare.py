@@ -0,0 +1,48 @@
+"""
+Compare two run_benchmarks.py result files and flag regressions.
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 0.2
+
+Records are matched on benchmark, dataset, rows and size parameters. Exits
+with status 1 if any median time grew by more than the threshold (default 20%).
+"""
+import sys
+import json
+import argparse
+
+KEY_FIELDS = ('benchmark', 'dataset', 'rows', 'foods', 'ingredients', 'k')
+
+def _key(result):
+    return tuple(result.get(field) for field in KEY_FIELDS)
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return {_key(r): r for r in json.load(f)['results']}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed relative slowdown (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = _load(args.baseline), _load(args.candidate)
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys(), key=str):
+        before, after = baseline[key]['median_s'], candidate[key]['median_s']
+        change = (after - before) / before if before > 0 else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  <-- REGRESSION'
+            regressions += 1
+        label = ' '.join(str(v) for v in key if v is not None)
+        print(f"{label:<70} {before * 1000:>10.3f} ms -> {after * 1000:>10.3f} ms  ({change:+.1%}){flag}")
+
+    for key in sorted(baseline.keys() ^ candidate.keys(), key=str):
+        print(f"{' '.join(str(v) for v in key if v is not None):<70} only in {'baseline' if key in baseline else 'candidate'}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Benchmark suite for CaloRhythm's hot paths.
+
+Covers data loading, calculator aggregation, optimizer solves and sweeps,
+automatic ingredient selection, Food Discovery ranking, similar-food queries and
+meal-plan aggregation, on the bundled data.xlsx and on generated composition
+tables. Results are written as one JSON document (metadata plus one flat
+record per measurement) so runs can be diffed to track regressions:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --sizes 100000 1000000 --skip-bundled
+
+Every record has 'benchmark', 'dataset', 'rows', 'median_s', 'min_s' and
+'repeats'; optimizer records also carry iteration and evaluation counts.
+All random inputs come from a fixed seed.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+import numpy as np
+import pandas as pd
+import scipy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from calorhythm.loader import DEFAULT_DATA_FILE, NUTRIENT_KEYS, parse_excel, read_food_table, build_food_index
+from calorhythm.optimizer import DEFAULT_LIMITS, SOLVER_BACKENDS, ResultCache, optimize
+from calorhythm.discovery import build_rank_index, top_k
+from calorhythm.similar import SimilarFoodIndex
+from calorhythm.sweep import sweep
+from calorhythm.selection import MIN_FOODS, MAX_FOODS, CandidatePool, select_foods
+from calorhythm.mealplan import MealPlanAggregator
+
+SEED = 20251210
+OPTIMIZER_SIZES = [2, 10, 50, 200]
+CALCULATOR_SIZES = [5, 20]
+RANK_COUNTS = [10, 100]
+SIMILAR_COUNT = 10
+SWEEP_POINTS = 25
+MEALPLAN_ENTRIES = 200_000
+MEALPLAN_CHUNK = 100_000
+
+def measure(fn, repeats):
+    """Run fn repeats times; return (median_s, min_s, last return value)."""
+    times = []
+    value = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times), value
+
+def record(benchmark, dataset, rows, timing, repeats, **extra):
+    median_s, min_s = timing[:2]
+    return {'benchmark': benchmark, 'dataset': dataset, 'rows': rows,
+            'median_s': median_s, 'min_s': min_s, 'repeats': repeats, **extra}
+
+def synthetic_table(rows, seed=SEED):
+    """A cleaned (df, cols_map) pair shaped like load_data()'s output, with plausible per-100 g values."""
+    rng = np.random.default_rng(seed)
+    carb = rng.gamma(1.2, 15.0, rows).clip(0, 100)
+    prot = rng.gamma(1.1, 8.0, rows).clip(0, 90)
+    fat = rng.gamma(0.8, 7.0, rows).clip(0, 100)
+    cols_map = {key: key for key in ['Food Name'] + NUTRIENT_KEYS}
+    df = pd.DataFrame({
+        'Food Name': [f"food-{i:07d}" for i in range(rows)],
+        'Energy': (4 * carb + 4 * prot + 9 * fat).round(0),
+        'Carbohydrate': carb.round(2),
+        'Protein': prot.round(2),
+        'Fat': fat.round(2),
+        'Sodium': rng.gamma(0.7, 300.0, rows).round(0),
+        'Sugar': (carb * rng.uniform(0, 0.6, rows)).round(2),
+    })
+    return df, cols_map
+
+def bench_load(dataset, data_file, repeats):
+    """Cold Excel parse vs memory-mapped Parquet cache of the same file."""
+    results = []
+    timing = measure(lambda: parse_excel(data_file), repeats)
+    rows = len(timing[2][0])
+    results.append(record('load_data.parse_excel', dataset, rows, timing, repeats))
+
+    cache_dir = tempfile.mkdtemp(prefix='calorhythm-bench-')
+    try:
+        read_food_table(data_file, cache_dir)
+        timing = measure(lambda: read_food_table(data_file, cache_dir), repeats)
+        results.append(record('load_data.parquet_cache', dataset, rows, timing, repeats))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+def bench_synthetic_load(dataset, df, cols_map, repeats):
+    """Parquet round trip and index building for a generated table (Excel cannot hold 1M rows)."""
+    from calorhythm.loader import _write_cached_table, _read_cached_table
+
+    results = []
+    cache_dir = tempfile.mkdtemp(prefix='calorhythm-bench-')
+    try:
+        cache_file = os.path.join(cache_dir, 'food_table-bench.parquet')
+        _write_cached_table(cache_file, df, cols_map)
+        timing = measure(lambda: _read_cached_table(cache_file), repeats)
+        results.append(record('load_data.parquet_cache', dataset, len(df), timing, repeats))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    timing = measure(lambda: build_food_index(df, cols_map), repeats)
+    results.append(record('load_food_index.build', dataset, len(df), timing, repeats))
+    return results
+
+def bench_calculator(dataset, df, cols_map, name_to_row, nutrients, rng, repeats):
+    """Per-meal totals: the original per-food boolean scan vs the indexed gather + dot product."""
+    results = []
+    names = list(name_to_row)
+    value_cols = [cols_map[key] for key in NUTRIENT_KEYS]
+    for k in CALCULATOR_SIZES:
+        foods = [names[i] for i in rng.choice(len(names), size=k, replace=False)]
+        amounts = rng.uniform(50, 300, size=k)
+
+        def scan():
+            totals = np.zeros(len(NUTRIENT_KEYS))
+            for food, amount in zip(foods, amounts):
+                row = df[df[cols_map['Food Name']] == food].iloc[0]
+                totals += row[value_cols].to_numpy(dtype=np.float64) * (amount / 100.0)
+            return totals
+
+        def indexed():
+            rows = [name_to_row[food] for food in foods]
+            return (amounts / 100.0) @ nutrients[rows]
+
+        results.append(record('calculator.scan', dataset, len(df), measure(scan, repeats), repeats, foods=k))
+        results.append(record('calculator.indexed', dataset, len(df), measure(indexed, repeats), repeats, foods=k))
+    return results
+
+def bench_optimizer(dataset, rows, name_to_row, nutrients, rng, problems):
+    """Cold solve latency and iteration counts per backend, over random ingredient sets of each size."""
+    results = []
+    names = list(name_to_row)
+    for n in OPTIMIZER_SIZES:
+        if n > len(names):
+            continue
+        food_sets = [[names[i] for i in rng.choice(len(names), size=n, replace=False)] for _ in range(problems)]
+        for backend in SOLVER_BACKENDS:
+            times, nits, nfevs, successes = [], [], [], 0
+            for foods in food_sets:
+                result = optimize(foods, {}, DEFAULT_LIMITS, 'Balanced', name_to_row, nutrients,
+                                  backend=backend, cache=ResultCache(maxsize=0))
+                times.append(result.elapsed)
+                nits.append(result.nit)
+                nfevs.append(result.nfev)
+                successes += result.success
+            results.append(record(
+                f'optimizer.{backend}', dataset, rows, (statistics.median(times), min(times)), problems,
+                ingredients=n, mean_nit=statistics.mean(nits), mean_nfev=statistics.mean(nfevs),
+                success_rate=successes / problems,
+            ))
+    return results
+
+def bench_sweep(dataset, rows, name_to_row, nutrients, rng, repeats):
+    """A calorie-limit sweep per backend, warm-started point to point vs cold solves at every point."""
+    results = []
+    names = list(name_to_row)
+    foods = [names[i] for i in rng.choice(len(names), size=min(10, len(names)), replace=False)]
+    grid = {'limit_cal': np.linspace(0.5, 1.5, SWEEP_POINTS) * DEFAULT_LIMITS['cal']}
+    for backend in SOLVER_BACKENDS:
+        for warm in (True, False):
+            timing = measure(lambda: sweep(foods, {}, DEFAULT_LIMITS, 'Balanced', name_to_row, nutrients, grid,
+                                           backend=backend, warm=warm), repeats)
+            result = timing[2]
+            results.append(record(f"sweep.{backend}.{'warm' if warm else 'cold'}", dataset, rows, timing, repeats,
+                                  points=SWEEP_POINTS, ingredients=len(foods), nit=result.nit, nfev=result.nfev,
+                                  failures=result.failures))
+    return results
+
+def bench_selection(dataset, name_to_row, nutrients, repeats):
+    """Automatic ingredient selection: shortlist + beam search + final solves, for every food count."""
+    results = []
+    timing = measure(lambda: CandidatePool(name_to_row, nutrients), repeats)
+    pool = timing[2]
+    results.append(record('selection.build_pool', dataset, len(pool), timing, repeats))
+    for k in range(MIN_FOODS, MAX_FOODS + 1):
+        timing = measure(lambda: select_foods(pool, k, DEFAULT_LIMITS, 'Balanced', cache=ResultCache(maxsize=0)), repeats)
+        result = timing[2]
+        results.append(record('selection.select_foods', dataset, len(pool), timing, repeats, foods=k,
+                              candidates=result.candidates, search_s=result.search_elapsed,
+                              loss=result.loss, success=bool(result.success)))
+    return results
+
+def bench_ranking(dataset, df, cols_map, nutrients, repeats):
+    """Food Discovery top/bottom-k: DataFrame nlargest/nsmallest vs slices of the rank index."""
+    results = []
+    timing = measure(lambda: build_rank_index(nutrients), repeats)
+    rank_index = timing[2]
+    results.append(record('ranking.build_index', dataset, len(df), timing, repeats))
+    col = cols_map['Protein']
+    for k in RANK_COUNTS:
+        pandas_rank = lambda: (df.nlargest(k, col), df.nsmallest(k, col))
+        index_rank = lambda: (df.iloc[top_k(rank_index, 'Protein', k)], df.iloc[top_k(rank_index, 'Protein', k, largest=False)])
+        results.append(record('ranking.nlargest_nsmallest', dataset, len(df), measure(pandas_rank, repeats), repeats, k=k))
+        results.append(record('ranking.rank_index', dataset, len(df), measure(index_rank, repeats), repeats, k=k))
+    return results
+
+def bench_similar(dataset, name_to_row, nutrients, rng, repeats):
+    """Similar foods: a scaled full-table distance scan vs the KD-tree, for random query foods."""
+    results = []
+    timing = measure(lambda: SimilarFoodIndex(name_to_row, nutrients), repeats)
+    index = timing[2]
+    results.append(record('similar.build_index', dataset, len(index), timing, repeats))
+
+    foods = [index.names[i] for i in rng.choice(len(index), size=min(20, len(index)), replace=False)]
+    scaled = index.values / index.scale
+
+    def scan():
+        for food in foods:
+            distances = np.linalg.norm(scaled - scaled[index.position[food]], axis=1)
+            np.argpartition(distances, SIMILAR_COUNT)[:SIMILAR_COUNT + 1]
+
+    def tree():
+        for food in foods:
+            index.similar(food, k=SIMILAR_COUNT)
+
+    def constrained():
+        for food in foods:
+            sodium = index.values[index.position[food], NUTRIENT_KEYS.index('Sodium')]
+            index.similar(food, k=SIMILAR_COUNT, ranges={'Sodium': (None, sodium / 2)})
+
+    # Per query, like the other per-call records
+    for name, fn in [('similar.scan', scan), ('similar.kdtree', tree), ('similar.kdtree_constrained', constrained)]:
+        median_s, min_s, _ = measure(fn, repeats)
+        results.append(record(name, dataset, len(index), (median_s / len(foods), min_s / len(foods)), repeats,
+                              k=SIMILAR_COUNT))
+    return results
+
+def bench_mealplan(dataset, name_to_row, nutrients, rng, repeats):
+    """Meal-plan totals: a pandas join + groupby vs chunked sparse products, for one plan of MEALPLAN_ENTRIES."""
+    names = np.array(list(name_to_row), dtype=object)
+    # 10 entries per meal, 3 meals per day
+    days = np.arange(MEALPLAN_ENTRIES) // 30 + 1
+    plan = pd.DataFrame({
+        'day': days.astype(str),
+        'meal': np.array(['breakfast', 'lunch', 'dinner'])[np.arange(MEALPLAN_ENTRIES) // 10 % 3],
+        'food': names[rng.integers(len(names), size=MEALPLAN_ENTRIES)],
+        'grams': rng.uniform(10, 300, MEALPLAN_ENTRIES).round(0),
+    })
+
+    def groupby():
+        values = nutrients[plan['food'].map(name_to_row).to_numpy()] * (plan['grams'].to_numpy()[:, None] / 100.0)
+        totals = pd.DataFrame(values, columns=NUTRIENT_KEYS)
+        totals['day'], totals['meal'] = plan['day'], plan['meal']
+        meals = totals.groupby(['day', 'meal'], sort=False).sum()
+        return meals.groupby(level=0, sort=False).sum()
+
+    def sparse_products():
+        aggregator = MealPlanAggregator(lambda foods: (name_to_row, nutrients))
+        for start in range(0, MEALPLAN_ENTRIES, MEALPLAN_CHUNK):
+            aggregator.add(plan.iloc[start:start + MEALPLAN_CHUNK])
+        return aggregator.finish()
+
+    return [
+        record(f'mealplan.{name}', dataset, len(names), measure(fn, repeats), repeats,
+               entries=MEALPLAN_ENTRIES, days=int(days[-1]))
+        for name, fn in [('groupby', groupby), ('sparse', sparse_products)]
+    ]
+
+def run_dataset(dataset, df, cols_map, repeats, problems):
+    name_to_row, nutrients = build_food_index(df, cols_map)
+    rng = np.random.default_rng(SEED)
+    results = []
+    results += bench_calculator(dataset, df, cols_map, name_to_row, nutrients, rng, repeats)
+    results += bench_optimizer(dataset, len(df), name_to_row, nutrients, rng, problems)
+    results += bench_sweep(dataset, len(df), name_to_row, nutrients, rng, repeats)
+    results += bench_selection(dataset, name_to_row, nutrients, repeats)
+    results += bench_ranking(dataset, df, cols_map, nutrients, repeats)
+    results += bench_similar(dataset, name_to_row, nutrients, rng, repeats)
+    results += bench_mealplan(dataset, name_to_row, nutrients, rng, repeats)
+    return results
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'seed': SEED,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the CaloRhythm benchmark suite.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100_000, 1_000_000],
+                        help="Rows of the generated tables (default: 100000 1000000)")
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE, help="Bundled food composition file")
+    parser.add_argument('--skip-bundled', action='store_true', help="Only benchmark generated tables")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed repetitions per measurement")
+    parser.add_argument('--problems', type=int, default=10, help="Random optimizer problems per ingredient count")
+    parser.add_argument('-o', '--output', default='-', help="JSON output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    if not args.skip_bundled:
+        dataset = os.path.basename(args.data)
+        print(f"Benchmarking {dataset}...", file=sys.stderr)
+        results += bench_load(dataset, args.data, max(1, args.repeats // 2))
+        df, cols_map = read_food_table(args.data)
+        results += run_dataset(dataset, df, cols_map, args.repeats, args.problems)
+
+    for rows in args.sizes:
+        dataset = f"synthetic-{rows}"
+        print(f"Benchmarking {dataset}...", file=sys.stderr)
+        df, cols_map = synthetic_table(rows)
+        results += bench_synthetic_load(dataset, df, cols_map, args.repeats)
+        results += run_dataset(dataset, df, cols_map, args.repeats, args.problems)
+
+    report = json.dumps({'meta': metadata(), 'results': results}, indent=2)
+    if args.output == '-':
+        print(report)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+CaloRhythm core logic, importable without Streamlit.
+
+- calorhythm.loader: data.xlsx parsing, columnar cache and lookup index
+- calorhythm.optimizer: Quantity Optimizer engine and solver backends
+- calorhythm.sweep: limit and weight sweeps over the optimizer
+- calorhythm.selection: automatic ingredient selection for the optimizer
+- calorhythm.mealplan: meal, day and week totals of multi-day meal plans
+- calorhythm.batch: command-line batch optimizer
+- calorhythm.database: indexed SQLite backend for the food table
+- calorhythm.similar: nearest-neighbour index for similar-food queries
+"""
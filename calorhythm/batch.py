@@ -0,0 +1,174 @@
+"""
+Headless batch optimizer.
+
+Solves many Quantity Optimizer problems across all CPU cores and streams one
+JSON result per line, in input order:
+
+    python -m calorhythm.batch problems.jsonl -o results.jsonl --workers 8
+
+JSONL input, one problem per line (only "foods" is required):
+
+    {"id": "lunch-1", "foods": ["...", "..."], "min_amounts": {"...": 100},
+     "limits": {"cal": 500, "carb": 60, "prot": 30, "fat": 15}, "priority_mode": "Balanced"}
+
+CSV input (.csv) uses the columns id, foods and min_amounts (both separated by ';'),
+limit_cal, limit_carb, limit_prot, limit_fat and priority_mode.
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calorhythm.loader import DEFAULT_DATA_FILE, DEFAULT_CACHE_DIR, read_food_table, build_food_index
+from calorhythm.optimizer import MACROS, DEFAULT_LIMITS, SOLVER_BACKEND, ResultCache, optimize
+
+# Per-process state, filled once by _init_worker
+_WORKER = {}
+
+def _init_worker(data_file, cache_dir, backend):
+    parsed = read_food_table(data_file, cache_dir)
+    if parsed is None:
+        raise ValueError(f"Could not find the header row in {data_file}")
+    _WORKER['index'] = build_food_index(*parsed)
+    _WORKER['backend'] = backend or SOLVER_BACKEND
+    _WORKER['results'] = ResultCache()
+    # Last solution per ingredient set, so problems differing only in limits warm-start
+    _WORKER['warm'] = ResultCache()
+
+def solve_problem(problem):
+    """Solve one problem dict in a worker and return its JSON-serializable result record."""
+    record = {'id': problem.get('id')}
+    if 'error' in problem:
+        record.update({'success': False, 'error': problem['error']})
+        return record
+    try:
+        foods = list(problem['foods'])
+        limits = {**DEFAULT_LIMITS, **problem.get('limits', {})}
+        priority_mode = problem.get('priority_mode', 'Balanced')
+        name_to_row, nutrients = _WORKER['index']
+
+        warm_key = (tuple(sorted(foods)), _WORKER['backend'])
+        result = optimize(foods, problem.get('min_amounts', {}), limits, priority_mode, name_to_row, nutrients,
+                          backend=_WORKER['backend'], warm_start=_WORKER['warm'].get(warm_key),
+                          cache=_WORKER['results'])
+        _WORKER['warm'].put(result.warm_key, result.warm_state)
+
+        record.update({
+            'success': result.success,
+            'message': result.message,
+            'backend': result.backend,
+            'elapsed_ms': round(result.elapsed * 1000, 3),
+            'cached': result.cached,
+            'portions': dict(zip(foods, result.x.tolist())),
+            'total_res': result.total_res,
+            'fulfillment': dict(zip(MACROS, result.percentages)),
+        })
+    except Exception as e:
+        record.update({'success': False, 'error': f"{type(e).__name__}: {e}"})
+    return record
+
+def _split(value):
+    return [v.strip() for v in value.split(';') if v.strip()] if value else []
+
+def _parse_csv_row(i, row):
+    foods = _split(row.get('foods'))
+    # Positional: an empty entry (e.g. ";900") is 0 g for that food, not skipped
+    mins = [float(v) if v.strip() else 0.0 for v in row['min_amounts'].split(';')] if row.get('min_amounts') else []
+    if mins and len(mins) != len(foods):
+        raise ValueError(f"min_amounts has {len(mins)} entries for {len(foods)} foods")
+    return {
+        'id': row.get('id') or i,
+        'foods': foods,
+        'min_amounts': dict(zip(foods, mins)),
+        'limits': {m: float(row[f'limit_{m}']) for m in MACROS if row.get(f'limit_{m}')},
+        'priority_mode': row.get('priority_mode') or 'Balanced',
+    }
+
+def read_problems(path):
+    """
+    Yield problem dicts from a JSONL or CSV file ('-' reads JSONL from stdin).
+    A CSV row or JSONL line that cannot be parsed is yielded as {'id', 'error'} and reported in its result record.
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                try:
+                    yield _parse_csv_row(i, row)
+                except ValueError as e:
+                    yield {'id': row.get('id') or i, 'error': f"Row {i + 1}: {e}"}
+        return
+
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                problem = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {'id': i, 'error': f"Line {i + 1}: {e}"}
+                continue
+            if not isinstance(problem, dict):
+                yield {'id': i, 'error': f"Line {i + 1}: expected a JSON object, got {type(problem).__name__}"}
+                continue
+            problem.setdefault('id', i)
+            yield problem
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def run_batch(problems, workers=None, data_file=DEFAULT_DATA_FILE, cache_dir=DEFAULT_CACHE_DIR, backend=None):
+    """
+    Solve problems on a process pool and yield result records in input order.
+    At most a few tasks per worker are in flight, so input and output are streamed.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Build the columnar cache once up front so workers only memory-map it
+    _init_worker(data_file, cache_dir, backend)
+
+    if workers == 1:
+        for problem in problems:
+            yield solve_problem(problem)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_file, cache_dir, backend)) as pool:
+        pending = deque()
+        for problem in problems:
+            pending.append(pool.submit(solve_problem, problem))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve CaloRhythm optimizer problems in bulk.")
+    parser.add_argument('problems', help="Problem file (.jsonl or .csv), or '-' for JSONL on stdin")
+    parser.add_argument('-o', '--output', default='-', help="Output JSONL file (default: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--backend', default=None, help="Solver backend (default: CALORHYTHM_SOLVER or 'slsqp')")
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE, help="Food composition file (default: data.xlsx)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    solved = failed = 0
+    try:
+        for record in run_batch(read_problems(args.problems), args.workers, args.data, backend=args.backend):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            if record['success']:
+                solved += 1
+            else:
+                failed += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Solved {solved} problems, {failed} failed.", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
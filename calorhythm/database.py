@@ -0,0 +1,226 @@
+"""
+SQLite storage backend for the cleaned food table.
+
+Instead of holding the whole table in every server process, the pages can
+query an indexed SQLite file. Set CALORHYTHM_DATABASE to the file, and
+optionally CALORHYTHM_DATASET to the version to serve. One file can hold
+several composition-DB versions ("datasets"), e.g. two RDA releases side by side.
+
+Build or update a dataset from the spreadsheet:
+
+    python -m calorhythm.database foods.db --data data.xlsx --dataset rda-10.3
+    python -m calorhythm.database foods.db --list
+
+SQLiteFoodTable answers the same queries as the in-memory FoodStore (see
+calorhythm.store), using indexes on (dataset, name) and (dataset, <nutrient>).
+Name lookups, top/bottom-k rankings and range filters are indexed queries,
+so the calculator, optimizer and Food Discovery pages keep only the food names
+in memory (for the search index). Similar Foods and Auto-select need every food's
+nutrients: on first use, each process reads the whole dataset once to build
+their indexes (float64, like with the in-memory table).
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+
+from calorhythm.loader import DEFAULT_DATA_FILE, NUTRIENT_KEYS, read_food_table
+
+# SQL column per nutrient key
+SQL_COLUMNS = {key: key.lower() for key in NUTRIENT_KEYS}
+# SQLite's default limit on bound parameters is 999
+MAX_PARAMS = 900
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY,
+    cols_map TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS foods (
+    dataset TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    name TEXT,
+    {', '.join(f'{col} REAL NOT NULL' for col in SQL_COLUMNS.values())},
+    PRIMARY KEY (dataset, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS foods_name ON foods (dataset, name, row);
+""" + ''.join(f"CREATE INDEX IF NOT EXISTS foods_{col} ON foods (dataset, {col}, row);\n" for col in SQL_COLUMNS.values())
+
+def write_dataset(df, cols_map, db_path, dataset):
+    """Write the cleaned (df, cols_map) as dataset into db_path, replacing a dataset of the same name."""
+    value_cols = [cols_map[key] for key in NUTRIENT_KEYS]
+    names = df[cols_map['Food Name']].astype(object).where(df[cols_map['Food Name']].notna(), None)
+    values = df[value_cols].to_numpy(dtype=np.float64)
+    rows = ((dataset, i, name, *map(float, vals)) for i, (name, vals) in enumerate(zip(names.tolist(), values)))
+
+    con = sqlite3.connect(db_path)
+    try:
+        with con:
+            con.executescript(SCHEMA)
+            con.execute("DELETE FROM foods WHERE dataset = ?", (dataset,))
+            con.executemany(f"INSERT INTO foods VALUES ({', '.join('?' * (3 + len(NUTRIENT_KEYS)))})", rows)
+            con.execute("INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?)",
+                        (dataset, json.dumps(cols_map, ensure_ascii=False), len(df), time.time()))
+        con.execute("ANALYZE")
+    finally:
+        con.close()
+
+def list_datasets(db_path):
+    """(name, row_count, created) of every dataset in db_path, newest first."""
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return con.execute("SELECT name, row_count, created FROM datasets ORDER BY created DESC").fetchall()
+    finally:
+        con.close()
+
+class SQLiteFoodTable:
+    """
+    Read-only view of one dataset in a SQLite file, with the query methods of FoodStore.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, db_path, dataset=None):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        self.db_path = db_path
+        self._local = threading.local()
+
+        datasets = list_datasets(db_path)
+        if not datasets:
+            raise ValueError(f"No datasets in {db_path}")
+        if dataset is None:
+            dataset = datasets[0][0]  # Newest
+        info = {name: count for name, count, _ in datasets}
+        if dataset not in info:
+            raise ValueError(f"Unknown dataset '{dataset}'. Choose from: {', '.join(info)}")
+
+        self.dataset = dataset
+        self._row_count = info[dataset]
+        row = self._con().execute("SELECT cols_map FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        self.cols_map = json.loads(row[0])
+        self._df = None
+
+    def _con(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.con = con
+        return con
+
+    @staticmethod
+    def _select(keys):
+        return ', '.join(['name'] + [SQL_COLUMNS[key] for key in dict.fromkeys(keys)])
+
+    def _query(self, sql, params=()):
+        return self._con().execute(sql, (self.dataset, *params)).fetchall()
+
+    def _frame(self, records, keys):
+        """DataFrame of (name, *values) records, labelled like load_data()'s columns."""
+        columns = list(dict.fromkeys([self.cols_map['Food Name']] + [self.cols_map[key] for key in keys]))
+        return pd.DataFrame.from_records(records, columns=columns)
+
+    def __len__(self):
+        return self._row_count
+
+    @property
+    def df(self):
+        """The whole dataset as load_data()'s DataFrame. Read on first use; prefer the query methods."""
+        if self._df is None:
+            records = self._query(f"SELECT {self._select(NUTRIENT_KEYS)} FROM foods WHERE dataset = ? ORDER BY row")
+            self._df = self._frame(records, NUTRIENT_KEYS)
+        return self._df
+
+    def names(self):
+        """Distinct food names in table order (first occurrence)."""
+        records = self._query("SELECT name FROM foods WHERE dataset = ? AND name IS NOT NULL ORDER BY row")
+        return list(dict.fromkeys(name for name, in records))
+
+    def head(self, n=5):
+        records = self._query(f"SELECT {self._select(NUTRIENT_KEYS)} FROM foods WHERE dataset = ? ORDER BY row LIMIT ?", (n,))
+        return self._frame(records, NUTRIENT_KEYS)
+
+    def lookup(self, foods):
+        """
+        (name_to_row, nutrients) restricted to foods: name -> row of the returned float64 matrix.
+        Duplicate names resolve to their first row, like build_food_index. Unknown names are omitted.
+        """
+        foods = list(dict.fromkeys(foods))
+        name_to_row, values = {}, []
+        value_cols = ', '.join(f'f.{col}' for col in SQL_COLUMNS.values())
+        for start in range(0, len(foods), MAX_PARAMS):
+            chunk = foods[start:start + MAX_PARAMS]
+            records = self._con().execute(
+                f"SELECT f.name, {value_cols} FROM foods f "
+                f"JOIN (SELECT MIN(row) AS row FROM foods WHERE dataset = ? AND name IN ({', '.join('?' * len(chunk))}) "
+                f"GROUP BY name) first ON f.dataset = ? AND f.row = first.row",
+                (self.dataset, *chunk, self.dataset),
+            ).fetchall()
+            for name, *vals in records:
+                name_to_row[name] = len(values)
+                values.append(vals)
+        return name_to_row, np.array(values, dtype=np.float64).reshape(len(values), len(NUTRIENT_KEYS))
+
+    def top_k(self, key, k, largest=True, keys=()):
+        """The k foods highest (or lowest) in nutrient key; ties keep table order, like nlargest/nsmallest."""
+        order = 'DESC' if largest else 'ASC'
+        records = self._query(
+            f"SELECT {self._select(keys)} FROM foods WHERE dataset = ? "
+            f"ORDER BY {SQL_COLUMNS[key]} {order}, row LIMIT ?", (k,))
+        return self._frame(records, keys)
+
+    def filter(self, ranges, sort_key, limit, keys=()):
+        """
+        (number of foods satisfying every (low, high) bound in ranges, the first limit of them
+        sorted by sort_key descending). Bounds are inclusive; None leaves a side open.
+        """
+        clauses, params = [], []
+        for key, (low, high) in ranges.items():
+            if low is not None:
+                clauses.append(f"{SQL_COLUMNS[key]} >= ?")
+                params.append(float(low))
+            if high is not None:
+                clauses.append(f"{SQL_COLUMNS[key]} <= ?")
+                params.append(float(high))
+        where = ' AND '.join(['dataset = ?'] + clauses)
+
+        count, = self._query(f"SELECT COUNT(*) FROM foods WHERE {where}", params)[0]
+        records = self._query(
+            f"SELECT {self._select(keys)} FROM foods WHERE {where} "
+            f"ORDER BY {SQL_COLUMNS[sort_key]} DESC, row LIMIT ?", (*params, limit))
+        return count, self._frame(records, keys)
+
+    def nbytes(self):
+        """Bytes held by each component (the nutrient data stays on disk)."""
+        return {'database_file': os.path.getsize(self.db_path)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the food composition table into an indexed SQLite file.")
+    parser.add_argument('database', help="SQLite file to create or update")
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE, help="Food composition Excel file (default: data.xlsx)")
+    parser.add_argument('--dataset', help="Dataset name (default: the Excel file name)")
+    parser.add_argument('--list', action='store_true', help="List the datasets in the database and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, rows, created in list_datasets(args.database):
+            print(f"{name}\t{rows} rows\t{time.strftime('%Y-%m-%d %H:%M', time.localtime(created))}")
+        return 0
+
+    parsed = read_food_table(args.data)
+    if parsed is None:
+        print(f"Could not find the header row in {args.data}", file=sys.stderr)
+        return 1
+    dataset = args.dataset or os.path.splitext(os.path.basename(args.data))[0]
+    write_dataset(*parsed, args.database, dataset)
+    print(f"Wrote {len(parsed[0])} rows to {args.database} as dataset '{dataset}'", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Sorted-order indexes over the nutrient matrix for the "3. Food Discovery" page.
+
+The index is built once per data load; top/bottom-k rankings are then array
+slices, range filters are binary searches and their matches are sorted by
+precomputed ranks, instead of full-table nlargest/nsmallest calls and boolean
+masks on every rerun.
+"""
+import numpy as np
+
+from calorhythm.loader import NUTRIENT_KEYS
+
+def build_rank_index(nutrients):
+    """
+    For every nutrient column of the matrix, precompute:
+    - 'asc' / 'desc': row positions sorted ascending / descending. Both sorts are stable,
+      so ties keep table order (the same rows df.nsmallest / df.nlargest return).
+    - 'asc_rank' / 'desc_rank': the position of every row in 'asc' / 'desc'.
+    - 'values': the column's values in ascending order, for binary search.
+    """
+    rank_index = {}
+    positions = np.arange(nutrients.shape[0])
+    for col, key in enumerate(NUTRIENT_KEYS):
+        values = nutrients[:, col]
+        asc = np.argsort(values, kind='stable')
+        desc = np.argsort(-values, kind='stable')
+        asc_rank, desc_rank = np.empty_like(asc), np.empty_like(desc)
+        asc_rank[asc] = positions
+        desc_rank[desc] = positions
+        rank_index[key] = {
+            'asc': asc,
+            'desc': desc,
+            'asc_rank': asc_rank,
+            'desc_rank': desc_rank,
+            'values': values[asc],
+        }
+    return rank_index
+
+def top_k(rank_index, key, k, largest=True):
+    """Row positions of the k foods highest (or lowest) in nutrient key."""
+    return rank_index[key]['desc' if largest else 'asc'][:k]
+
+# order_by sorts the matches' ranks unless they exceed 1/3 of the table
+DENSE_ORDER_FRACTION = 3
+
+def order_by(rank_index, key, rows, largest=True):
+    """
+    Reorder a subset of row positions by nutrient key. Their precomputed ranks are
+    distinct, so sorting them gives the full sort order restricted to rows, at a cost
+    that grows with len(rows) rather than with the table. When rows cover more than
+    1 / DENSE_ORDER_FRACTION of the table, one pass over the full order is cheaper.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    entry = rank_index[key]
+    if len(rows) * DENSE_ORDER_FRACTION > len(entry['asc']):
+        order = entry['desc' if largest else 'asc']
+        selected = np.zeros(len(order), dtype=bool)
+        selected[rows] = True
+        return order[selected[order]]
+    rank = entry['desc_rank' if largest else 'asc_rank']
+    return rows[np.argsort(rank[rows])]
+
+def _bound(bound, dtype):
+    """
+    A bound at the precision of the stored column. The float32 store holds 0.1 as
+    0.1000000015, which a float64 bound of 0.1 would exclude from "<= 0.1".
+    """
+    return None if bound is None else dtype.type(bound)
+
+def _range_slice(entry, low, high):
+    values = entry['values']
+    low, high = _bound(low, values.dtype), _bound(high, values.dtype)
+    start = 0 if low is None else np.searchsorted(values, low, side='left')
+    stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+    return entry['asc'][start:stop]
+
+def range_query(rank_index, nutrients, ranges):
+    """
+    Row positions of foods satisfying every (low, high) bound in ranges
+    (nutrient key -> (low, high), inclusive; None leaves a side open).
+
+    Each bound is a binary search on its sorted column, at the column's own
+    precision. Only the rows of the most selective range are checked against
+    the remaining bounds.
+    Rows are returned in table order.
+    """
+    ranges = {key: bounds for key, bounds in ranges.items() if bounds != (None, None)}
+    if not ranges:
+        return np.arange(nutrients.shape[0])
+
+    candidates = {key: _range_slice(rank_index[key], *bounds) for key, bounds in ranges.items()}
+    driver = min(candidates, key=lambda key: len(candidates[key]))
+    rows = np.sort(candidates[driver])
+
+    for key, (low, high) in ranges.items():
+        if key == driver or len(rows) == 0:
+            continue
+        values = nutrients[rows, NUTRIENT_KEYS.index(key)]
+        low, high = _bound(low, values.dtype), _bound(high, values.dtype)
+        keep = np.ones(len(rows), dtype=bool)
+        if low is not None:
+            keep &= values >= low
+        if high is not None:
+            keep &= values <= high
+        rows = rows[keep]
+    return rows
@@ -0,0 +1,171 @@
+"""
+Headless data loading for the RDA food composition table.
+
+Parses data.xlsx into the cleaned (df, cols_map) pair, keeps a Parquet copy in
+.cache/ keyed by the spreadsheet's hash, and builds the lookup structures used
+by the calculator and optimizer. Nothing here depends on Streamlit.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA_FILE = os.path.join(PROJECT_DIR, 'data.xlsx')
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_DIR, '.cache')
+
+# Column order of the contiguous nutrient matrix (values per 100 g)
+NUTRIENT_KEYS = ['Energy', 'Carbohydrate', 'Protein', 'Fat', 'Sodium', 'Sugar']
+NUTRIENT_UNITS = {'Energy': 'kcal', 'Carbohydrate': 'g', 'Protein': 'g', 'Fat': 'g', 'Sodium': 'mg', 'Sugar': 'g'}
+
+# KFDA adult daily standards (2,000 kcal basis), used by the calculator and meal plans
+DAILY_STANDARDS = {'Carbohydrate': 324.0, 'Protein': 55.0, 'Fat': 54.0}
+
+CACHE_VERSION = 1  # Bump when the cleaning logic below changes
+
+def _file_fingerprint(file_path):
+    """Return a SHA-256 digest of the source file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_path(cache_dir, fingerprint):
+    return os.path.join(cache_dir, f"food_table-v{CACHE_VERSION}-{fingerprint[:16]}.parquet")
+
+def _read_cached_table(cache_file):
+    """Memory-map a cleaned table written by _write_cached_table. Returns None on a miss."""
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        table = pq.read_table(cache_file, memory_map=True)
+        meta = json.loads(table.schema.metadata[b'calorhythm'])
+        return table.to_pandas(), meta['cols_map']
+    except Exception:
+        # Corrupt or foreign file: fall back to parsing the spreadsheet
+        return None
+
+def _write_cached_table(cache_file, df, cols_map):
+    """Atomically write the cleaned table and cols_map, removing stale versions."""
+    cache_dir = os.path.dirname(cache_file)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'calorhythm'] = json.dumps({'cols_map': cols_map}).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_file)
+        os.replace(tmp_file, cache_file)
+
+        for name in os.listdir(cache_dir):
+            stale = os.path.join(cache_dir, name)
+            if name.startswith('food_table-') and name.endswith('.parquet') and stale != cache_file:
+                os.remove(stale)
+    except OSError:
+        # A read-only deployment still works, it just re-parses on cold start
+        pass
+
+def parse_excel(file_path):
+    """Parse and clean the raw RDA spreadsheet. Returns (df, cols_map), or None if no header row is found."""
+    # Define mapping: English Key -> Actual Excel Headers (Must match raw data)
+    required_keywords = {
+        'Food Name': ['식품명', '식품이름'],
+        'Energy': ['에너지', '열량'],
+        'Carbohydrate': ['탄수화물'],
+        'Protein': ['단백질'],
+        'Fat': ['지방'],
+        'Sodium': ['나트륨'],
+        'Sugar': ['당류', '총당류']
+    }
+
+    # Read Excel loosely to find the header row
+    df_raw = pd.read_excel(file_path, engine='openpyxl', header=None, nrows=10)
+
+    # 🟢 [Updated] Logic translated to English
+    # Find the row index using the keywords defined above (avoiding hardcoded Korean strings)
+    target_identifiers = required_keywords['Food Name']
+    header_row_idx = -1
+
+    for i, row in df_raw.iterrows():
+        row_str = row.astype(str).values
+        # Check if any identifier exists in the current row
+        if any(keyword in s for keyword in target_identifiers for s in row_str):
+            header_row_idx = i
+            break
+
+    if header_row_idx == -1:
+        return None
+
+    # Reload with correct header
+    df = pd.read_excel(file_path, engine='openpyxl', header=header_row_idx)
+    df.columns = df.columns.str.strip()
+
+    # Map Columns: English Key -> Actual Excel Column Name
+    cols_map = {}
+    for key, keywords in required_keywords.items():
+        found = False
+        for col in df.columns:
+            if any(k in col for k in keywords):
+                cols_map[key] = col
+                found = True
+                break
+        # Handle missing Sugar column
+        if not found and key == 'Sugar':
+            df['Sugar(g)'] = 0
+            cols_map['Sugar'] = 'Sugar(g)'
+
+    final_cols = list(cols_map.values())
+    df = df[final_cols]
+
+    # Convert numeric columns
+    target_keys = ['Energy', 'Carbohydrate', 'Protein', 'Fat', 'Sugar', 'Sodium']
+
+    for key in target_keys:
+        col_name = cols_map[key]
+        # Replace '-' with 0, 'Tr' with 0.01
+        df[col_name] = df[col_name].astype(str).replace({'-': '0', 'Tr': '0.01'})
+        df[col_name] = pd.to_numeric(df[col_name], errors='coerce').fillna(0)
+
+    return df, cols_map
+
+def read_food_table(file_path=DEFAULT_DATA_FILE, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Return the cleaned (df, cols_map) for file_path, reusing the columnar cache
+    while the file is unchanged. Returns None if no header row is found.
+    Raises FileNotFoundError if file_path does not exist.
+    """
+    # Reuse the cleaned columnar copy while data.xlsx is unchanged
+    cache_file = _cache_path(cache_dir, _file_fingerprint(file_path))
+    cached = _read_cached_table(cache_file)
+    if cached is not None:
+        return cached
+
+    parsed = parse_excel(file_path)
+    if parsed is not None:
+        df, cols_map = parsed
+        _write_cached_table(cache_file, df, cols_map)
+    return parsed
+
+def build_food_index(df, cols_map, dtype=np.float64):
+    """
+    Build the lookup structures shared by the calculator and optimizer:
+    - name_to_row: Food Name -> row position (duplicate names resolve to the first row)
+    - nutrients: C-contiguous matrix of shape (rows, len(NUTRIENT_KEYS)) and the given dtype
+    """
+    if df.empty:
+        return {}, np.empty((0, len(NUTRIENT_KEYS)), dtype=dtype)
+
+    names = df[cols_map['Food Name']]
+    keep = (~names.duplicated(keep='first') & names.notna()).to_numpy()
+    name_to_row = dict(zip(names[keep].tolist(), np.flatnonzero(keep).tolist()))
+
+    nutrients = np.ascontiguousarray(
+        df[[cols_map[key] for key in NUTRIENT_KEYS]].to_numpy(dtype=dtype)
+    )
+    return name_to_row, nutrients
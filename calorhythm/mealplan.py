@@ -0,0 +1,247 @@
+"""
+Multi-day meal plans: nutrient totals per meal, per day and per week, and their
+deviations from the daily standards (DAILY_STANDARDS), for plans of any length.
+
+A plan is a CSV file with one entry per line:
+
+    day,meal,food,grams
+    1,breakfast,"귀리, 겉귀리, 도정, 밥",210
+    1,breakfast,"달걀, 생것",50
+    2024-03-04,lunch,"닭고기, 가슴살, 생것",150
+
+'day' is a day number (1, 2, ...; days 1-7 are week 1) or a date (ISO weeks).
+The entries of one day must be contiguous, as they are in any plan listed day by day.
+
+Entries are read in chunks of CHUNK_ROWS. Each chunk becomes one sparse
+(meals x foods) matrix of grams / 100, and its product with the nutrient matrix
+gives the totals of every meal in the chunk at once. Day totals are a second
+sparse (days x meals) product; week totals are summed from days. Meal and day
+rows are streamed out as soon as their day is complete:
+
+    python -m calorhythm.mealplan plan.csv -o days.csv --level day
+"""
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from calorhythm.loader import DEFAULT_DATA_FILE, NUTRIENT_KEYS, DAILY_STANDARDS, read_food_table, build_food_index
+from calorhythm.metrics import timed
+
+PLAN_COLUMNS = ['day', 'meal', 'food', 'grams']
+CHUNK_ROWS = 100_000
+LEVELS = ['meal', 'day', 'week']
+
+def read_plan(source, chunksize=CHUNK_ROWS):
+    """Yield the entries of a plan CSV (path or file object) as DataFrame chunks with PLAN_COLUMNS."""
+    reader = pd.read_csv(source, usecols=PLAN_COLUMNS, chunksize=chunksize,
+                         dtype={'day': str, 'meal': str, 'food': str})
+    for chunk in reader:
+        chunk['grams'] = pd.to_numeric(chunk['grams'], errors='coerce')
+        chunk['meal'] = chunk['meal'].fillna('')
+        yield chunk
+
+def week_labels(days):
+    """Week of each day label: (n - 1) // 7 + 1 for day numbers, 'YYYY-Www' (ISO) for dates."""
+    numbers = pd.to_numeric(days, errors='coerce')
+    if numbers.notna().all():
+        return ((numbers.astype(np.int64) - 1) // 7 + 1).astype(str).to_numpy()
+    dates = pd.to_datetime(days, errors='coerce')
+    if dates.isna().any():
+        bad = pd.Series(days)[dates.isna()].iloc[0]
+        raise ValueError(f"Day '{bad}' is neither a day number nor a date")
+    iso = dates.dt.isocalendar()
+    return (iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)).to_numpy()
+
+def _deviations(frame, days):
+    """Add '<nutrient> vs Standard' columns: totals minus the standard for the number of days."""
+    for key, standard in DAILY_STANDARDS.items():
+        frame[f'{key} vs Standard'] = frame[key] - standard * days
+    return frame
+
+class MealPlanAggregator:
+    """
+    Streams a plan through add() chunk by chunk, then finish().
+
+    lookup(foods) -> (name_to_row, nutrients) covers the foods of a chunk, like
+    FoodStore.lookup / SQLiteFoodTable.lookup. Entries with unknown foods or
+    missing grams are skipped and counted in unknown / invalid.
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.entries = 0
+        self.days = 0
+        self.invalid = 0
+        self.unknown = {}
+        self._carry = None
+        self._last_day = None
+        self._done_days = set()
+        self._weeks = {}
+
+    def add(self, chunk):
+        """Aggregate a chunk of entries. Returns (meals, days) for the days completed so far."""
+        if not len(chunk):
+            return self._aggregate(chunk, np.zeros(0, dtype=np.intp), [])
+        # Codes number the days in order of appearance, so the days are contiguous
+        # exactly when the runs of equal codes are 0, 1, 2, ...
+        day_codes, day_keys = pd.factorize(chunk['day'])
+        if day_codes.min() < 0:
+            raise ValueError("Every entry needs a day")
+        run_starts = np.flatnonzero(np.r_[True, day_codes[1:] != day_codes[:-1]])
+        if len(run_starts) != len(day_keys) or any(day in self._done_days for day in day_keys) or \
+                (self._last_day is not None and self._last_day in day_keys[1:]):
+            raise ValueError("The entries of each day must be contiguous (list the plan day by day)")
+        self.entries += len(chunk)
+
+        # The last day may continue in the next chunk. The carry is a single day, so
+        # the day codes of the completed days follow from this chunk's codes.
+        cut = run_starts[-1]
+        head, tail = chunk.iloc[:cut], chunk.iloc[cut:]
+        head_codes, head_days = day_codes[:cut], list(day_keys[:-1])
+        if self._carry is not None:
+            if self._last_day == day_keys[0] and not cut:
+                tail = pd.concat([self._carry, tail], ignore_index=True)
+            else:
+                if self._last_day != day_keys[0]:
+                    head_codes, head_days = head_codes + 1, [self._last_day] + head_days
+                head = pd.concat([self._carry, head], ignore_index=True)
+                head_codes = np.concatenate([np.zeros(len(self._carry), dtype=head_codes.dtype), head_codes])
+        self._last_day = day_keys[-1]
+        self._carry = tail
+        return self._aggregate(head, head_codes, head_days)
+
+    def finish(self):
+        """(meals, days, weeks) for the rest of the plan. weeks covers the whole plan."""
+        carry, self._carry = self._carry, None
+        if carry is None:
+            meals, days = self._aggregate(pd.DataFrame(columns=PLAN_COLUMNS), np.zeros(0, dtype=np.intp), [])
+        else:
+            meals, days = self._aggregate(carry, np.zeros(len(carry), dtype=np.intp), [self._last_day])
+        weeks = pd.DataFrame(
+            [totals for _, totals in self._weeks.values()], columns=NUTRIENT_KEYS,
+        ).reindex(columns=NUTRIENT_KEYS)
+        weeks.insert(0, 'week', list(self._weeks))
+        weeks.insert(1, 'days', [n for n, _ in self._weeks.values()])
+        return meals, days, _deviations(weeks, weeks['days'].to_numpy())
+
+    def _aggregate(self, entries, day_of_entry, day_keys):
+        with timed('mealplan_chunk_seconds'):
+            return self._aggregate_entries(entries, day_of_entry, day_keys)
+
+    def _aggregate_entries(self, entries, day_of_entry, day_keys):
+        """Totals of complete days; day_of_entry indexes day_keys, in order of appearance."""
+        # Only the distinct foods of the chunk are looked up
+        food_codes, foods = pd.factorize(entries['food'])
+        foods = foods.tolist()
+        name_to_row, nutrients = self.lookup(foods)
+        rows = np.array([name_to_row.get(food, -1) for food in foods], dtype=np.intp)
+        entry_rows = np.where(food_codes >= 0, rows[food_codes], -1)
+        known = entry_rows >= 0
+        valid = known & entries['grams'].notna().to_numpy()
+        self.invalid += int((known & ~valid).sum())
+        for food, count in entries.loc[~known, 'food'].value_counts(dropna=False).items():
+            self.unknown[food] = self.unknown.get(food, 0) + int(count)
+
+        # Meals: distinct (day, meal) pairs in order of appearance
+        meal_of_entry, meal_names = pd.factorize(entries['meal'])
+        meal_codes, pairs = pd.factorize(day_of_entry.astype(np.int64) * max(len(meal_names), 1) + meal_of_entry)
+        day_codes = pairs // max(len(meal_names), 1)
+
+        # One sparse (meals x foods) product gives every meal's totals
+        grams = sparse.csr_matrix(
+            (entries['grams'].to_numpy(dtype=np.float64)[valid] / 100.0, (meal_codes[valid], entry_rows[valid])),
+            shape=(len(pairs), len(nutrients)),
+        )
+        meal_totals = np.asarray(grams @ np.asarray(nutrients, dtype=np.float64)).reshape(len(pairs), len(NUTRIENT_KEYS))
+
+        # Days: a (days x meals) 0/1 matrix over the meal totals
+        membership = sparse.csr_matrix((np.ones(len(pairs)), (day_codes, np.arange(len(pairs)))),
+                                       shape=(len(day_keys), len(pairs)))
+        day_totals = membership @ meal_totals
+
+        day_keys = np.asarray(day_keys, dtype=object)
+        meals = pd.DataFrame(meal_totals, columns=NUTRIENT_KEYS)
+        meals.insert(0, 'day', day_keys[day_codes])
+        meals.insert(1, 'meal', np.asarray(meal_names, dtype=object)[pairs % max(len(meal_names), 1)])
+
+        weeks = week_labels(pd.Series(day_keys)) if len(day_keys) else np.array([], dtype=object)
+        days = pd.DataFrame(day_totals, columns=NUTRIENT_KEYS)
+        days.insert(0, 'day', day_keys)
+        days.insert(1, 'week', weeks)
+        days.insert(2, 'meals', np.bincount(day_codes, minlength=len(day_keys)))
+        days = _deviations(days, 1)
+
+        week_codes, week_keys = pd.factorize(weeks)
+        week_sums = sparse.csr_matrix((np.ones(len(weeks)), (week_codes, np.arange(len(weeks)))),
+                                      shape=(len(week_keys), len(weeks))) @ day_totals
+        for week, n_days, totals in zip(week_keys, np.bincount(week_codes, minlength=len(week_keys)), week_sums):
+            n, week_totals = self._weeks.get(week, (0, np.zeros(len(NUTRIENT_KEYS))))
+            self._weeks[week] = (n + int(n_days), week_totals + totals)
+        self._done_days.update(day_keys)
+        self.days += len(day_keys)
+        return meals, days
+
+def iter_plan_totals(chunks, lookup):
+    """
+    Aggregate plan chunks and yield (level, DataFrame) batches as they complete:
+    'meal' and 'day' batches while streaming, then one 'week' batch at the end.
+    Returns the MealPlanAggregator (with its entry counts) as the generator's value.
+    """
+    aggregator = MealPlanAggregator(lookup)
+    for chunk in chunks:
+        meals, days = aggregator.add(chunk)
+        if len(days):
+            yield 'meal', meals
+            yield 'day', days
+    meals, days, weeks = aggregator.finish()
+    yield 'meal', meals
+    yield 'day', days
+    yield 'week', weeks
+    return aggregator
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute meal, day and week nutrient totals of a meal plan.")
+    parser.add_argument('plan', help="Plan CSV with the columns day, meal, food and grams ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output CSV file (default: stdout)")
+    parser.add_argument('--level', choices=LEVELS, default='day', help="Totals to write (default: day)")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS, help="Entries per chunk")
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE, help="Food composition file (default: data.xlsx)")
+    args = parser.parse_args(argv)
+
+    parsed = read_food_table(args.data)
+    if parsed is None:
+        print(f"Could not find the header row in {args.data}", file=sys.stderr)
+        return 1
+    index = build_food_index(*parsed)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    header = True
+    batches = iter_plan_totals(read_plan(sys.stdin if args.plan == '-' else args.plan, args.chunksize),
+                               lambda foods: index)
+    try:
+        while True:
+            try:
+                level, frame = next(batches)
+            except StopIteration as stop:
+                aggregator = stop.value
+                break
+            if level == args.level:
+                frame.to_csv(out, header=header, index=False)
+                out.flush()
+                header = False
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    skipped = sum(aggregator.unknown.values())
+    print(f"Aggregated {aggregator.entries} entries over {aggregator.days} days"
+          f" ({skipped} with unknown foods, {aggregator.invalid} without grams skipped).", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+In-process metrics for the hot paths: data loading, page renders, optimizer
+solves, chart construction, cache lookups and session-state size.
+
+Every observation is kept in a process-wide registry (METRICS) and written as
+one JSON line to the 'calorhythm.metrics' logger. The registry is exported in
+the Prometheus text format by the hidden admin page (main.py?admin=1) and, if
+CALORHYTHM_METRICS_PORT is set, by a small HTTP endpoint for scraping.
+
+Set CALORHYTHM_METRICS_LOG to a file path to write the structured log there.
+Solves slower than CALORHYTHM_SLOW_SOLVE_MS (default 250 ms), or that fail,
+are logged at WARNING level together with their inputs.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+SLOW_SOLVE_MS = float(os.environ.get('CALORHYTHM_SLOW_SOLVE_MS', '250'))
+# Recent observations kept per series for the exported quantiles
+WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+logger = logging.getLogger('calorhythm.metrics')
+# Like any library: no output unless the application (or CALORHYTHM_METRICS_LOG) configures it
+logger.addHandler(logging.NullHandler())
+if os.environ.get('CALORHYTHM_METRICS_LOG'):
+    _handler = logging.FileHandler(os.environ['CALORHYTHM_METRICS_LOG'], encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Metric name -> help text, also the export order. Metrics missing here are exported after these.
+DESCRIPTIONS = {
+    'load_seconds': "Time spent in the cached data loaders, including cache hits.",
+    'page_render_seconds': "Wall time of one page render (one Streamlit rerun).",
+    'fragment_render_seconds': "Wall time of one page section (st.fragment) run, including partial reruns.",
+    'chart_build_seconds': "Time spent building a chart or styled table.",
+    'reload_seconds': "Time to rebuild a data snapshot after data.xlsx changed (background thread).",
+    'reloads_total': "Background data reloads by outcome.",
+    'solver_seconds': "Wall time of one optimizer solve (cache misses only).",
+    'solver_iterations': "Solver iterations (nit) per solve.",
+    'solver_evaluations': "Objective evaluations (nfev) per solve.",
+    'solver_ingredients': "Number of ingredients per solve.",
+    'solves_total': "Optimizer solves by backend and outcome.",
+    'sweep_seconds': "Wall time of one optimizer trade-off sweep (all points).",
+    'selection_search_seconds': "Shortlist and beam search time of one automatic ingredient selection.",
+    'similar_query_seconds': "Time of one Similar Foods query.",
+    'mealplan_chunk_seconds': "Time to aggregate one chunk of a meal plan.",
+    'cache_requests_total': "Cache lookups by cache and result (hit/miss).",
+    'session_state_bytes': "Approximate size of one session's st.session_state, sampled on every rerun.",
+    'process_resident_memory_bytes': "Resident set size of the server process.",
+}
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+class Summary:
+    """Count, sum and max of every observation, plus a window of recent values for quantiles."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = float('-inf')
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, value):
+        value = float(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def quantile(self, q):
+        values = sorted(self.recent)
+        if not values:
+            return float('nan')
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+class MetricsRegistry:
+    """Thread-safe counters and summaries, keyed by metric name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.summaries = {}
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            if key not in self.summaries:
+                self.summaries[key] = Summary()
+            self.summaries[key].observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.summaries.clear()
+
+    def snapshot(self):
+        """List of flat dicts (one per series) for display."""
+        with self._lock:
+            rows = [{'metric': name, 'labels': dict(labels), 'count': value}
+                    for (name, labels), value in self.counters.items()]
+            for (name, labels), s in self.summaries.items():
+                rows.append({
+                    'metric': name, 'labels': dict(labels), 'count': s.count,
+                    'mean': s.total / s.count, 'max': s.max,
+                    **{f'p{int(q * 100)}': s.quantile(q) for q in QUANTILES},
+                })
+        return sorted(rows, key=lambda r: (r['metric'], sorted(r['labels'].items())))
+
+    def prometheus_text(self):
+        """Prometheus text exposition (version 0.0.4) of every series."""
+        rss = resident_memory_bytes()
+        with self._lock:
+            counters = dict(self.counters)
+            summaries = {key: (s.count, s.total, [(q, s.quantile(q)) for q in QUANTILES])
+                         for key, s in self.summaries.items()}
+
+        recorded = {name for name, _ in counters} | {name for name, _ in summaries}
+        extra = {name: f"CaloRhythm metric {name}." for name in sorted(recorded - set(DESCRIPTIONS))}
+        lines = []
+        for name, help_text in {**DESCRIPTIONS, **extra}.items():
+            full_name = f'calorhythm_{name}'
+            if name == 'process_resident_memory_bytes':
+                if rss is not None:
+                    lines += [f'# HELP {full_name} {help_text}', f'# TYPE {full_name} gauge', f'{full_name} {rss}']
+                continue
+            counter_series = sorted((labels, v) for (n, labels), v in counters.items() if n == name)
+            summary_series = sorted((labels, v) for (n, labels), v in summaries.items() if n == name)
+            if not counter_series and not summary_series:
+                continue
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {"counter" if counter_series else "summary"}')
+            for labels, value in counter_series:
+                lines.append(f'{full_name}{_format_labels(labels)} {value}')
+            for labels, (count, total, quantiles) in summary_series:
+                for q, value in quantiles:
+                    lines.append(f'{full_name}{_format_labels(labels + (("quantile", str(q)),))} {value!r}')
+                lines.append(f'{full_name}_sum{_format_labels(labels)} {total!r}')
+                lines.append(f'{full_name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+METRICS = MetricsRegistry()
+
+def log_event(event, level=logging.INFO, **fields):
+    """Write one structured (JSON) log line."""
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps({'ts': round(time.time(), 3), 'event': event, **fields},
+                                     ensure_ascii=False, default=str))
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the wall time of the block as metric name (seconds) and log it."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.observe(name, elapsed, **labels)
+        log_event(name, elapsed_ms=round(elapsed * 1000, 3), **labels)
+
+def record_cache(cache, hit):
+    METRICS.inc('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+def record_solve(result, foods, limits, priority_mode):
+    """Record a fresh (uncached) optimizer solve; slow or failed solves are logged with their inputs."""
+    backend = result.backend
+    status = 'success' if result.success else 'failure'
+    METRICS.inc('solves_total', backend=backend, status=status)
+    METRICS.observe('solver_seconds', result.elapsed, backend=backend)
+    METRICS.observe('solver_ingredients', len(foods), backend=backend)
+    if result.get('nit') is not None:
+        METRICS.observe('solver_iterations', result.nit, backend=backend)
+    if result.get('nfev') is not None:
+        METRICS.observe('solver_evaluations', result.nfev, backend=backend)
+
+    elapsed_ms = result.elapsed * 1000
+    pathological = not result.success or elapsed_ms > SLOW_SOLVE_MS
+    log_event(
+        'solve', level=logging.WARNING if pathological else logging.INFO,
+        backend=backend, status=status, elapsed_ms=round(elapsed_ms, 3), nit=result.get('nit'),
+        nfev=result.get('nfev'), ingredients=len(foods), warm_started=result.warm_started,
+        message=str(result.message),
+        **({'foods': list(foods), 'limits': limits, 'priority_mode': priority_mode} if pathological else {}),
+    )
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate memory footprint of obj and everything it references (bytes)."""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    nbytes = getattr(obj, 'nbytes', None)
+    if isinstance(nbytes, int):  # NumPy arrays
+        return sys.getsizeof(obj) + (0 if getattr(obj, 'base', None) is not None else nbytes)
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):  # DataFrames
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), _seen)
+    return size
+
+def resident_memory_bytes():
+    """Current RSS of this process on Linux, else peak RSS where available, else None."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+def start_http_exporter(port, host='0.0.0.0'):
+    """Serve prometheus_text() at http://host:port/metrics from a daemon thread. Returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = METRICS.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='calorhythm-metrics', daemon=True).start()
+    return server
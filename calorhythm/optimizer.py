@@ -0,0 +1,272 @@
+"""
+Diet optimizer engine: computes ingredient portions that fill the four
+nutrient limits (Calories, Carbohydrate, Protein, Fat) as closely as the
+priority weights demand, without exceeding any of them.
+
+Used by the "2. Quantity Optimizer" page and by the batch CLI (calorhythm.batch).
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from scipy.optimize import minimize, lsq_linear, OptimizeResult
+
+from calorhythm.loader import NUTRIENT_KEYS
+from calorhythm.metrics import record_cache, record_solve
+
+# Short keys used for limits, weights and totals, and the nutrient columns they map to
+MACROS = ['cal', 'carb', 'prot', 'fat']
+MACRO_KEYS = ['Energy', 'Carbohydrate', 'Protein', 'Fat']
+
+# Default per-meal limits shown in the UI
+DEFAULT_LIMITS = {'cal': 500.0, 'carb': 60.0, 'prot': 30.0, 'fat': 15.0}
+
+PRIORITY_MODES = ["Balanced", "Prioritize Protein 🔥", "Prioritize Carbs 🍚", "Prioritize Fat 🥑", "Fill Calories ⚡"]
+PRIORITY_WEIGHT = 100
+
+# Select the backend with the CALORHYTHM_SOLVER environment variable ('slsqp' or 'bvls')
+SOLVER_BACKEND = os.environ.get('CALORHYTHM_SOLVER', 'slsqp')
+MAX_PORTION_G = 2000
+
+def _solve_slsqp(A, limits, weights, lower, upper, warm_start):
+    """SLSQP on the weighted least-squares loss with analytic gradient and constant constraint Jacobian."""
+    scale = 1.0 / (limits + 1e-6)
+
+    def objective(x):
+        r = (limits - A @ x) * scale
+        return float(weights @ (r * r))
+
+    def objective_grad(x):
+        r = (limits - A @ x) * scale
+        return -2.0 * (A.T @ (weights * scale * r))
+
+    # Constraints: A @ x <= limits (linear, constant Jacobian)
+    constraints = (
+        {'type': 'ineq', 'fun': lambda x: limits - A @ x, 'jac': lambda x: -A},
+    )
+
+    if warm_start is not None and 'x' in warm_start:
+        x0 = np.clip(warm_start['x'], lower, upper)
+    else:
+        x0 = lower + 10.0
+
+    result = minimize(objective, x0, jac=objective_grad, method='SLSQP',
+                      bounds=list(zip(lower, upper)), constraints=constraints)
+    result.warm_state = {'x': result.x}
+    return result
+
+# BVLS success: the primal point must be feasible to FEASIBILITY_TOL (relative to each limit,
+# like lsq_linear's own tol) and within GAP_TOL (relative) of the dual bound
+FEASIBILITY_TOL = 1e-10
+GAP_TOL = 1e-4
+BVLS_MAX_ITER = 20  # Inner BVLS iterations per ingredient
+DUAL_RESTARTS = 3   # L-BFGS-B restarts while the duality gap is too large
+
+def _solve_bvls(A, limits, weights, lower, upper, warm_start):
+    """
+    Convex dual of the same problem: for multipliers mu >= 0 on A @ x <= limits, the inner
+    problem is a bounded least-squares fit to shifted limits, solved exactly by BVLS.
+    The 4-dimensional concave dual is maximized with L-BFGS-B.
+
+    The inner solution at the final multipliers can overshoot a limit slightly when the
+    dual stops early. It is pulled back towards the minimums until feasible, and the
+    result succeeds when its objective is within GAP_TOL of the dual value (a lower bound).
+    The dual is piecewise quadratic, so L-BFGS-B can stall at a kink; it is restarted
+    from where it stopped while the gap is too large.
+    """
+    scale = 1.0 / (limits + 1e-6)
+    row_weight = np.sqrt(weights) * scale
+    M = row_weight[:, None] * A
+    curvature = 2.0 * weights * scale * scale
+    tol = FEASIBILITY_TOL * np.maximum(limits, 1.0)
+    base = A @ lower
+    inner = {'x': lower.copy(), 'nit': 0}
+
+    if np.any(base > limits + tol):
+        message = ('Limits cannot be met with the minimum intakes.' if np.any(lower > 0)
+                   else 'Limits cannot be met.')
+        return OptimizeResult(x=lower.copy(), fun=np.nan, success=False, message=message, nit=0, nfev=0,
+                              inner_nit=0, warm_state=dict(warm_start or {}))
+
+    def neg_dual(mu):
+        # BVLS's default cap of n iterations can stop short of the inner optimum
+        fit = lsq_linear(M, row_weight * (limits - mu / curvature), bounds=(lower, upper), method='bvls',
+                         max_iter=BVLS_MAX_ITER * len(lower))
+        inner['x'] = fit.x
+        inner['nit'] += fit.nit
+        slack = A @ fit.x - limits
+        r = -slack * scale
+        return -(float(weights @ (r * r)) + float(mu @ slack)), -slack
+
+    if warm_start is not None and 'mu' in warm_start:
+        mu = warm_start['mu']
+    else:
+        mu = np.zeros(len(limits))
+
+    nit = nfev = 0
+    for _ in range(DUAL_RESTARTS + 1):
+        dual = minimize(neg_dual, mu, jac=True, method='L-BFGS-B',
+                        bounds=[(0.0, None)] * len(limits), options={'gtol': 1e-8, 'ftol': 1e-12})
+        mu, nit, nfev = dual.x, nit + dual.nit, nfev + dual.nfev
+        # Refresh the primal point at the final multipliers
+        dual_value = -neg_dual(mu)[0]
+        x = np.clip(inner['x'], lower, upper)
+
+        # Scale the step from the minimums back until every limit holds (A >= 0)
+        step = A @ (x - lower)
+        over = step > limits - base + tol
+        if np.any(over):
+            x = lower + np.min((limits - base)[over] / step[over]) * (x - lower)
+
+        r = (limits - A @ x) * scale
+        fun = float(weights @ (r * r))
+        gap = fun - dual_value
+        success = bool(np.all(A @ x <= limits + tol) and gap <= GAP_TOL * max(fun, 1.0))
+        if success:
+            break
+
+    return OptimizeResult(
+        x=x, fun=fun, success=success,
+        message='Optimization terminated successfully' if success else f'Duality gap {gap:.2e} too large ({dual.message})',
+        nit=nit, nfev=nfev, inner_nit=inner['nit'], gap=gap,
+        warm_state={'x': x, 'mu': mu},
+    )
+
+SOLVER_BACKENDS = {
+    'slsqp': _solve_slsqp,
+    'bvls': _solve_bvls,
+}
+
+def solve_portions(A, limits, weights, lower, upper=None, backend=None, warm_start=None):
+    """
+    Find portions x (g) minimizing sum(weights * ((limits - A @ x) / limits) ** 2)
+    subject to A @ x <= limits and lower <= x <= upper.
+
+    Returns a scipy OptimizeResult extended with 'backend', 'elapsed' (seconds),
+    'warm_started' and 'warm_state' (pass back as warm_start on the next solve).
+    """
+    backend = backend or SOLVER_BACKEND
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend '{backend}'. Choose from: {', '.join(SOLVER_BACKENDS)}")
+
+    limits = np.asarray(limits, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.full_like(lower, MAX_PORTION_G) if upper is None else np.asarray(upper, dtype=np.float64)
+
+    start = time.perf_counter()
+    result = SOLVER_BACKENDS[backend](A, limits, weights, lower, upper, warm_start)
+    result.elapsed = time.perf_counter() - start
+    result.backend = backend
+    result.warm_started = warm_start is not None
+    return result
+
+# Result Cache: shared by every caller in this process
+RESULT_CACHE_SIZE = int(os.environ.get('CALORHYTHM_RESULT_CACHE_SIZE', '1024'))
+
+class ResultCache:
+    """Thread-safe LRU cache of solver results with hit/miss counters. Cached results are read-only."""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+def priority_weights(priority_mode):
+    """Weights per macro for a priority mode; the prioritized macro gets PRIORITY_WEIGHT."""
+    weights = {'cal': 1, 'carb': 1, 'prot': 1, 'fat': 1}
+
+    if "Protein" in priority_mode: weights['prot'] = PRIORITY_WEIGHT
+    elif "Carbs" in priority_mode: weights['carb'] = PRIORITY_WEIGHT
+    elif "Fat" in priority_mode: weights['fat'] = PRIORITY_WEIGHT
+    elif "Calories" in priority_mode: weights['cal'] = PRIORITY_WEIGHT
+    return weights
+
+def build_problem(foods, name_to_row, nutrients):
+    """Per-gram matrix A (4 x n) of Energy, Carbohydrate, Protein and Fat for the given foods."""
+    macro_cols = [NUTRIENT_KEYS.index(k) for k in MACRO_KEYS]
+    rows = [name_to_row[food] for food in foods]
+    return nutrients[np.ix_(rows, macro_cols)].T.astype(np.float64) / 100.0
+
+# Safe Percentage
+def safe_percentage(val, limit):
+    if limit == 0: return 0.0
+    return min((val / limit) * 100, 100.0)
+
+def summarize(A, x, limits):
+    """Return (total_res, percentages) for portions x: totals per macro and capped fulfillment (%) of each limit."""
+    total_res = dict(zip(MACROS, (A @ x).tolist()))
+    percentages = [safe_percentage(total_res[m], limits[m]) for m in MACROS]
+    return total_res, percentages
+
+def optimize(foods, min_amounts, limits, priority_mode, name_to_row, nutrients,
+             backend=None, warm_start=None, cache=None):
+    """
+    Solve one optimizer problem end to end.
+
+    foods: ingredient names; min_amounts: food -> minimum grams (missing = 0);
+    limits: macro -> limit (see MACROS). The problem is solved in canonical
+    (sorted) ingredient order so equal problems share a cache entry.
+
+    Returns an OptimizeResult with 'x' (grams, in the order of foods), 'success',
+    'message', 'backend', 'nit', 'nfev', 'elapsed', 'warm_started', 'cached', 'warm_key',
+    'warm_state', 'total_res' and 'percentages'.
+    """
+    backend = backend or SOLVER_BACKEND
+    order = sorted(range(len(foods)), key=lambda i: foods[i])
+    canonical = [foods[i] for i in order]
+
+    A = build_problem(canonical, name_to_row, nutrients)
+    limit_vec = [float(limits[m]) for m in MACROS]
+    weights = priority_weights(priority_mode)
+    user_min_bounds = [float(min_amounts.get(food, 0.0)) for food in canonical]
+
+    cache_key = (tuple(canonical), tuple(user_min_bounds), tuple(limit_vec), priority_mode, backend)
+    result = cache.get(cache_key) if cache is not None else None
+    cached = result is not None
+    if cache is not None:
+        record_cache('optimizer_results', cached)
+    if not cached:
+        result = solve_portions(A, limit_vec, [weights[m] for m in MACROS], user_min_bounds,
+                                backend=backend, warm_start=warm_start)
+        record_solve(result, canonical, limits, priority_mode)
+        if cache is not None:
+            cache.put(cache_key, result)
+
+    final_weights = np.empty(len(foods))
+    final_weights[order] = result.x
+    total_res, percentages = summarize(A, result.x, limits)
+
+    # Fresh object: cached results are shared and must not be mutated
+    return OptimizeResult(
+        x=final_weights, success=bool(result.success) and not np.isnan(final_weights).any(),
+        message=str(result.message), backend=result.backend, nit=result.get('nit'), nfev=result.get('nfev'),
+        elapsed=0.0 if cached else result.elapsed, warm_started=False if cached else result.warm_started,
+        cached=cached, warm_key=(tuple(canonical), backend), warm_state=result.warm_state,
+        total_res=total_res, percentages=percentages,
+    )
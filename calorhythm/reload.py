@@ -0,0 +1,146 @@
+"""
+Background hot-reload of the food composition file.
+
+A DataReloader owns the current DataSnapshot: the FoodStore built from
+data.xlsx (or the SQLite table opened from CALORHYTHM_DATABASE) plus the
+indexes derived from it (rank index, search index). A
+daemon thread polls the file's size and mtime; once a change has settled
+(two polls in a row see the same stat), it builds a complete new snapshot,
+including every derived index the old one had built, and only then swaps it
+in with a single assignment. Requests never wait on a reload: until the swap
+they keep reading the old snapshot.
+
+If the new file cannot be parsed, the old snapshot stays in service and the
+failure is logged. Nothing here depends on Streamlit.
+"""
+import os
+import time
+import logging
+import threading
+
+from calorhythm.metrics import METRICS, timed, log_event, record_cache
+
+def _file_stat(file_path):
+    """(size, mtime_ns) of file_path, or None if it does not exist right now."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+class DataSnapshot:
+    """One immutable version of the data: the store, its load error (or None) and lazily built derived indexes."""
+
+    def __init__(self, version, store, error, source_stat):
+        self.version = version
+        self.store = store
+        self.error = error
+        self.source_stat = source_stat
+        self.loaded_at = time.time()
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name, build):
+        """The index called name, built from this snapshot's store by build(store) on first use."""
+        value = self._derived.get(name)
+        record_cache(name, hit=value is not None)
+        if value is None:
+            with self._lock:
+                if name not in self._derived:
+                    self._derived[name] = build(self.store)
+                value = self._derived[name]
+        return value
+
+    def warm_from(self, other, builders):
+        """Prebuild every derived index that other already built (used before a swap)."""
+        for name in list(other._derived):
+            if name in builders:
+                self._derived[name] = builders[name](self.store)
+
+class DataReloader:
+    """
+    Serve the current DataSnapshot of file_path and rebuild it in the background when the file changes.
+
+    load(file_path) -> (store, error) builds a store; builders maps derived index names to
+    build(store) functions, so a reload can prebuild the indexes already in use.
+    """
+
+    def __init__(self, file_path, load, builders=None, interval=2.0):
+        self.file_path = file_path
+        self.load = load
+        self.builders = builders or {}
+        self.interval = interval
+        self._version = 0
+        self._failed_stat = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.current = self._build()
+
+    def _build(self, previous=None):
+        self._version += 1
+        source_stat = _file_stat(self.file_path)
+        store, error = self.load(self.file_path)
+        snapshot = DataSnapshot(self._version, store, error, source_stat)
+        if previous is not None and error is None:
+            if hasattr(store, 'warm_from'):
+                store.warm_from(previous.store)
+            snapshot.warm_from(previous, self.builders)
+        return snapshot
+
+    def reload(self):
+        """Rebuild now (in the calling thread) and swap the new snapshot in. Returns True if swapped."""
+        with self._reload_lock:
+            previous = self.current
+            source_stat = _file_stat(self.file_path)
+            try:
+                with timed('reload_seconds'):
+                    snapshot = self._build(previous)
+                error = snapshot.error
+            except Exception as e:
+                snapshot, error = None, str(e)
+            if snapshot is None or (error is not None and previous.error is None):
+                # Keep serving the last good version; don't retry until the file changes again
+                self._failed_stat = source_stat
+                METRICS.inc('reloads_total', status='failure')
+                log_event('reload', level=logging.WARNING, status='failure', file=self.file_path,
+                          error=error, serving_version=previous.version)
+                return False
+
+            self.current = snapshot  # Atomic swap: readers see either the old or the new snapshot
+        status = 'success' if snapshot.error is None else 'failure'
+        METRICS.inc('reloads_total', status=status)
+        log_event('reload', status=status, file=self.file_path, version=snapshot.version, rows=len(snapshot.store))
+        return True
+
+    def request_reload(self):
+        """Reload in a background thread, without waiting for it."""
+        threading.Thread(target=self.reload, name='calorhythm-reload', daemon=True).start()
+
+    def start(self):
+        """Start the daemon watcher thread (once). No-op if interval <= 0."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, name='calorhythm-reloader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        pending = None
+        while not self._stop.is_set():
+            if self._stop.wait(self.interval):
+                break
+
+            stat = _file_stat(self.file_path)
+            if stat is None or stat in (self.current.source_stat, self._failed_stat):
+                pending = None
+                continue
+            elif stat != pending:
+                # Changed since the last poll: wait until the writer has finished
+                pending = stat
+                continue
+
+            pending = None
+            self.reload()
@@ -0,0 +1,146 @@
+"""
+Data shared by every page: the cleaned table and the indexes derived from it.
+
+All of it lives in one DataSnapshot (see calorhythm.reload), built once per
+process and shared by every session without copying. A background thread
+rebuilds the snapshot when data.xlsx changes and swaps it in atomically.
+main.py pins the current snapshot at the start of each rerun, so a rerun
+never mixes two versions and never waits on a reload.
+
+Loader timings ('load_seconds') and derived-index cache hits
+('cache_requests_total') are recorded in calorhythm.metrics.
+"""
+import os
+import threading
+import streamlit as st
+import pandas as pd
+
+from calorhythm.loader import DEFAULT_DATA_FILE, read_food_table
+from calorhythm.metrics import timed, start_http_exporter
+from calorhythm.reload import DataReloader
+from calorhythm.store import FoodStore
+
+# Seconds between checks of the data file for changes (0 disables hot-reload)
+RELOAD_INTERVAL = float(os.environ.get('CALORHYTHM_RELOAD_INTERVAL', '2'))
+
+# Serve an indexed SQLite file instead of the in-memory table (see calorhythm.database)
+DATABASE_FILE = os.environ.get('CALORHYTHM_DATABASE')
+DATASET = os.environ.get('CALORHYTHM_DATASET')
+
+# Smart Data Loader Function
+def _load_store(file_path):
+    """Build the compact, read-only FoodStore (see calorhythm.store). Returns (store, error message or None)."""
+    with timed('load_seconds', loader='food_store'):
+        try:
+            parsed = read_food_table(file_path)
+            if parsed is None:
+                return FoodStore(pd.DataFrame(), {}), "⚠️ Could not find the header row in the Excel file."
+            return FoodStore(*parsed), None
+
+        except FileNotFoundError:
+            return FoodStore(pd.DataFrame(), {}), "⚠️ 'data.xlsx' file not found."
+        except Exception as e:
+            return FoodStore(pd.DataFrame(), {}), f"Error loading data: {e}"
+
+def _open_database(file_path):
+    """Open DATASET of the SQLite file (see calorhythm.database). Returns (table, error message or None)."""
+    from calorhythm.database import SQLiteFoodTable
+
+    with timed('load_seconds', loader='sqlite'):
+        try:
+            return SQLiteFoodTable(file_path, DATASET), None
+        except FileNotFoundError:
+            return FoodStore(pd.DataFrame(), {}), f"⚠️ Database '{file_path}' not found."
+        except Exception as e:
+            return FoodStore(pd.DataFrame(), {}), f"Error opening database: {e}"
+
+def _build_search_index(store):
+    from calorhythm.search import FoodSearchIndex
+
+    return FoodSearchIndex(store.names())
+
+def _build_similar_index(store):
+    from calorhythm.similar import SimilarFoodIndex
+
+    return SimilarFoodIndex(*store.lookup(store.names()))
+
+def _build_candidate_pool(store):
+    from calorhythm.selection import CandidatePool
+
+    return CandidatePool(*store.lookup(store.names()))
+
+# Derived index name -> builder; a reload prebuilds the ones already in use
+DERIVED_INDEXES = {
+    'search_index': _build_search_index,
+    'similar_index': _build_similar_index,
+    'candidate_pool': _build_candidate_pool,
+}
+
+@st.cache_resource
+def get_reloader():
+    """The process-wide DataReloader. The first call loads the data; later changes are picked up in the background."""
+    if DATABASE_FILE:
+        reloader = DataReloader(DATABASE_FILE, _open_database, DERIVED_INDEXES, interval=RELOAD_INTERVAL)
+    else:
+        reloader = DataReloader(DEFAULT_DATA_FILE, _load_store, DERIVED_INDEXES, interval=RELOAD_INTERVAL)
+    reloader.start()
+    return reloader
+
+# The snapshot pinned by the rerun running in this thread
+_pinned = threading.local()
+
+def pin_snapshot():
+    """Pin the current snapshot for the rest of this rerun (called at the top of main.py)."""
+    _pinned.snapshot = get_reloader().current
+    return _pinned.snapshot
+
+def current_snapshot():
+    """
+    This rerun's pinned snapshot, or the current one outside a pinned rerun.
+    Fragment reruns skip main.py, so fragments take their snapshot as an argument instead.
+    """
+    return getattr(_pinned, 'snapshot', None) or get_reloader().current
+
+def load_store():
+    """
+    The food table of this rerun's snapshot and its load error (or None): a FoodStore,
+    or a SQLiteFoodTable with the same query methods when CALORHYTHM_DATABASE is set.
+    """
+    snapshot = current_snapshot()
+    return snapshot.store, snapshot.error
+
+def load_table():
+    """The food table for a page (see load_store), showing the load error if there is one."""
+    store, error = load_store()
+    if error:
+        st.error(error)
+    return store
+
+def load_data():
+    """The cleaned (df, cols_map) pair. df is shared read-only: derive, never modify in place."""
+    store = load_table()
+    return store.df, store.cols_map
+
+def load_search_index(snapshot=None):
+    """Food-name search index of snapshot (default: this rerun's), shared read-only by all sessions."""
+    return (snapshot or current_snapshot()).derived('search_index', _build_search_index)
+
+def load_similar_index(snapshot=None):
+    """Nearest-neighbour index over nutrient vectors (see calorhythm.similar), built once per data version."""
+    return (snapshot or current_snapshot()).derived('similar_index', _build_similar_index)
+
+def load_candidate_pool(snapshot=None):
+    """Every distinct food with its macro matrix, for automatic ingredient selection (see calorhythm.selection)."""
+    return (snapshot or current_snapshot()).derived('candidate_pool', _build_candidate_pool)
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Start the Prometheus endpoint once per process if CALORHYTHM_METRICS_PORT is set."""
+    port = os.environ.get('CALORHYTHM_METRICS_PORT')
+    if not port:
+        return None
+    try:
+        return start_http_exporter(int(port))
+    except (OSError, ValueError) as e:
+        st.warning(f"Metrics exporter not started on port {port}: {e}")
+        return None
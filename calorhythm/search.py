@@ -0,0 +1,162 @@
+"""
+Server-side incremental search over food names.
+
+Built once per data load, so the multiselects only receive the top matches for
+the current query instead of every food name in the database. Each query term
+is matched as a substring against one of three keys per name:
+
+- jamo: the name decomposed into Hangul jamo, so partially typed syllables
+  match ('닭가스' finds '닭가슴살', and so does the IME's intermediate '닭갓')
+- initials: the leading consonant of every syllable ('ㄷㄱㅅㅅ' finds '닭가슴살')
+- roman: Revised Romanization without spaces ('dakgaseum' finds '닭가슴살')
+
+All terms of a query must match (e.g. '귀리 밥').
+"""
+import re
+import unicodedata
+from collections import defaultdict
+import numpy as np
+
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+COMPAT_INITIALS = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+COMPAT_VOWELS = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+
+# Revised Romanization (no sound-change rules)
+ROMAN_INITIALS = ['g', 'kk', 'n', 'd', 'tt', 'r', 'm', 'b', 'pp', 's', 'ss', '', 'j', 'jj', 'ch', 'k', 't', 'p', 'h']
+ROMAN_VOWELS = ['a', 'ae', 'ya', 'yae', 'eo', 'e', 'yeo', 'ye', 'o', 'wa', 'wae', 'oe', 'yo', 'u', 'wo', 'we', 'wi',
+                'yu', 'eu', 'ui', 'i']
+ROMAN_FINALS = ['', 'k', 'k', 'k', 'n', 'n', 'n', 't', 'l', 'k', 'm', 'l', 'l', 'l', 'p', 'l', 'm', 'p', 'p', 't',
+                't', 'ng', 't', 't', 'k', 't', 'p', 't']
+
+# Final consonant index -> (final kept in the syllable, initial of the next syllable).
+# While typing '가슴', the IME briefly shows '갓'; the trailing ㅅ may still become the next initial.
+FINAL_TO_NEXT_INITIAL = {
+    1: (0, 0), 2: (0, 1), 3: (1, 9), 4: (0, 2), 5: (4, 12), 6: (4, 18), 7: (0, 3), 8: (0, 5),
+    9: (8, 0), 10: (8, 6), 11: (8, 7), 12: (8, 9), 13: (8, 16), 14: (8, 17), 15: (8, 18), 16: (0, 6),
+    17: (0, 7), 18: (17, 9), 19: (0, 9), 20: (0, 10), 21: (0, 11), 22: (0, 12), 23: (0, 14), 24: (0, 15),
+    25: (0, 16), 26: (0, 17), 27: (0, 18),
+}
+
+_SEPARATORS = re.compile(r'[\s,()\[\]/·]+')
+
+def _syllable(ch):
+    """(initial, vowel, final) indexes of a Hangul syllable, or None."""
+    code = ord(ch)
+    if not HANGUL_BASE <= code <= HANGUL_LAST:
+        return None
+    code -= HANGUL_BASE
+    return code // 588, (code % 588) // 28, code % 28
+
+def _compose(initial, vowel, final=0):
+    return chr(HANGUL_BASE + initial * 588 + vowel * 28 + final)
+
+def jamo_key(text):
+    """Lowercased text with syllables and compatibility jamo turned into conjoining jamo."""
+    out = []
+    for ch in text.lower():
+        if ch in COMPAT_INITIALS:
+            out.append(chr(0x1100 + COMPAT_INITIALS.index(ch)))
+        elif ch in COMPAT_VOWELS:
+            out.append(chr(0x1161 + COMPAT_VOWELS.index(ch)))
+        else:
+            out.append(ch)
+    return unicodedata.normalize('NFD', ''.join(out))
+
+def initials_key(text):
+    return ''.join(COMPAT_INITIALS[s[0]] if (s := _syllable(ch)) else ch for ch in text.lower())
+
+def roman_key(text):
+    out = []
+    for ch in text.lower():
+        s = _syllable(ch)
+        out.append(ROMAN_INITIALS[s[0]] + ROMAN_VOWELS[s[1]] + ROMAN_FINALS[s[2]] if s else ch)
+    return ''.join(out)
+
+def _terms(text):
+    return [t for t in _SEPARATORS.split(text.strip()) if t]
+
+class FoodSearchIndex:
+    """Bigram inverted indexes over the jamo, initials and roman keys of every food name."""
+
+    FIELDS = ('jamo', 'initials', 'roman')
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.keys = {field: [] for field in self.FIELDS}
+        for name in self.names:
+            words = _terms(str(name))
+            self.keys['jamo'].append(' '.join(jamo_key(w) for w in words))
+            self.keys['initials'].append(' '.join(initials_key(w) for w in words))
+            self.keys['roman'].append(' '.join(roman_key(w) for w in words))
+
+        self.postings = {}
+        for field in self.FIELDS:
+            grams = defaultdict(set)
+            for doc, key in enumerate(self.keys[field]):
+                for i in range(len(key)):
+                    grams[key[i]].add(doc)
+                    if i + 1 < len(key):
+                        grams[key[i:i + 2]].add(doc)
+            self.postings[field] = {g: np.fromiter(sorted(d), dtype=np.int32, count=len(d)) for g, d in grams.items()}
+
+    def _field_variants(self, term):
+        """The key field a term is matched against, and its accepted spellings."""
+        term = term.lower()
+        if all(ch in COMPAT_INITIALS for ch in term):
+            return 'initials', [term]
+        if term.isascii():
+            return 'roman', [term]
+
+        variants = [jamo_key(term)]
+        last = _syllable(term[-1])
+        if last and last[2]:
+            keep, next_initial = FINAL_TO_NEXT_INITIAL[last[2]]
+            variants.append(jamo_key(term[:-1] + _compose(last[0], last[1], keep) + COMPAT_INITIALS[next_initial]))
+        return 'jamo', variants
+
+    def _match(self, field, key):
+        """Document ids whose field contains key: bigram postings intersection, then verification."""
+        postings = self.postings[field]
+        grams = {key[i:i + 2] for i in range(len(key) - 1)} or {key}
+        lists = sorted((postings.get(g) for g in grams), key=lambda p: 0 if p is None else len(p))
+        if lists[0] is None:
+            return np.empty(0, dtype=np.int32)
+        docs = lists[0]
+        for p in lists[1:]:
+            docs = np.intersect1d(docs, p, assume_unique=True)
+            if len(docs) == 0:
+                return docs
+        keys = self.keys[field]
+        return np.array([d for d in docs.tolist() if key in keys[d]], dtype=np.int32)
+
+    def search(self, query, limit=50):
+        """
+        Names matching every term of query, best first: names matching the first term as
+        typed before those matching only its IME-alternate spelling; within each, names
+        starting with the term, then earlier matches, then shorter names. An empty query returns the first names in table order.
+        """
+        terms = _terms(query)
+        if not terms:
+            return self.names[:limit]
+
+        first = None
+        docs = None
+        for term in terms:
+            field, variants = self._field_variants(term)
+            matched = np.unique(np.concatenate([self._match(field, v) for v in variants]))
+            docs = matched if docs is None else np.intersect1d(docs, matched, assume_unique=True)
+            if first is None:
+                first = (field, variants)
+            if len(docs) == 0:
+                return []
+
+        field, variants = first
+        keys = self.keys[field]
+
+        def rank(doc):
+            # The query as typed always outranks its IME-alternate spelling, even as a prefix
+            variant, pos = next(((i, keys[doc].find(v)) for i, v in enumerate(variants) if v in keys[doc]),
+                                (len(variants), len(keys[doc])))
+            return variant, pos != 0, pos, len(self.names[doc]), doc
+
+        return [self.names[d] for d in sorted(docs.tolist(), key=rank)[:limit]]
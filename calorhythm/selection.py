@@ -0,0 +1,150 @@
+"""
+Automatic ingredient selection for the Quantity Optimizer: choose which k foods
+(k from MIN_FOODS to MAX_FOODS) best meet the four limits and the priority,
+then compute their portions.
+
+Trying every k-combination of thousands of foods with SLSQP is out of the
+question, so the search narrows down in three vectorized steps:
+
+1. Shortlist: every food is scored alone (closed-form best portion under the
+   limits), and the SHORTLIST_SIZE best are kept, plus the foods densest in
+   each macro so that complementary foods (e.g. pure protein) survive.
+2. Beam search: combinations grow one food at a time. Each level scores
+   BEAM_WIDTH x shortlist extensions at once with a batched, ridge-regularized
+   least-squares fit that is clipped to the bounds and scaled down under the
+   limits, and keeps the BEAM_WIDTH best.
+3. The FINAL_SOLVES best combinations are solved exactly with optimize()
+   (and its result cache), and the one with the lowest loss is returned.
+"""
+import time
+import numpy as np
+
+from calorhythm.loader import NUTRIENT_KEYS
+from calorhythm.metrics import METRICS
+from calorhythm.optimizer import MACROS, MACRO_KEYS, MAX_PORTION_G, optimize, priority_weights
+
+MIN_FOODS, MAX_FOODS = 2, 5
+SHORTLIST_SIZE = 300
+BEAM_WIDTH = 30
+FINAL_SOLVES = 3
+# Per macro, foods with the largest share of that macro also join the shortlist
+DENSE_PER_MACRO = 25
+
+class CandidatePool:
+    """Every distinct food, with its per-100 g nutrients and per-gram macro matrix. Read-only once built."""
+
+    def __init__(self, name_to_row, nutrients):
+        self.names = list(name_to_row)
+        values = np.asarray(nutrients, dtype=np.float64)[list(name_to_row.values())]
+        self.nutrients = values.reshape(len(self.names), len(NUTRIENT_KEYS))
+        self.name_to_row = {name: i for i, name in enumerate(self.names)}
+        # (foods, 4) per-gram Energy, Carbohydrate, Protein and Fat
+        self.macros = self.nutrients[:, [NUTRIENT_KEYS.index(key) for key in MACRO_KEYS]] / 100.0
+        self.nutrients.setflags(write=False)
+        self.macros.setflags(write=False)
+
+    def __len__(self):
+        return len(self.names)
+
+def _fit(B, w, lower, upper):
+    """
+    Approximate losses of a batch of problems. B: (C, k, 4) per-gram macros relative to the
+    limits; w: (4,) weights; lower, upper: (C, k). Returns (C,) losses of feasible portions.
+    """
+    k = B.shape[1]
+    gram = np.einsum('cki,i,cli->ckl', B, w, B)
+    ridge = 1e-9 * (np.trace(gram, axis1=1, axis2=2) / k + 1e-12)
+    gram += ridge[:, None, None] * np.eye(k)
+    rhs = np.einsum('cki,i->ck', B, w)
+    x = np.clip(np.linalg.solve(gram, rhs[..., None])[..., 0], lower, upper)
+
+    # Scale down under the limits; minimums may still push a combination over them
+    totals = np.einsum('cki,ck->ci', B, x)
+    factor = np.minimum(1.0, 1.0 / np.maximum(totals.max(axis=1), 1e-12))
+    x = np.maximum(x * factor[:, None], lower)
+    totals = np.einsum('cki,ck->ci', B, x)
+    over = np.maximum(totals - 1.0, 0.0)
+    return ((1.0 - totals) ** 2) @ w + 1e6 * (over ** 2).sum(axis=1)
+
+def _shortlist(G, w, exclude):
+    """Indexes of the foods worth combining. G: (foods, 4) per-gram macros relative to the limits."""
+    norm = (G * G) @ w
+    usable = (norm > 0) & ~exclude
+    safe = np.where(usable, norm, 1.0)
+    # Best single-food portion: unconstrained optimum, capped by the tightest limit and MAX_PORTION_G
+    cap = np.min(np.where(G > 0, 1.0 / np.where(G > 0, G, 1.0), np.inf), axis=1)
+    x = np.clip((G @ w) / safe, 0.0, np.minimum(cap, MAX_PORTION_G))
+    score = np.where(usable, ((1.0 - G * x[:, None]) ** 2) @ w, np.inf)
+
+    picks = [np.argsort(score, kind='stable')[:SHORTLIST_SIZE]]
+    share = G / np.maximum(G.sum(axis=1, keepdims=True), 1e-12)
+    for j in range(G.shape[1]):
+        picks.append(np.argsort(np.where(usable, -share[:, j], np.inf), kind='stable')[:DENSE_PER_MACRO])
+    shortlist = np.unique(np.concatenate(picks))
+    return shortlist[usable[shortlist]]
+
+def weighted_loss(total_res, limits, weights):
+    """The optimizer's objective for totals total_res (see calorhythm.optimizer.summarize)."""
+    return sum(weights[m] * ((limits[m] - total_res[m]) / (limits[m] + 1e-6)) ** 2 for m in MACROS)
+
+def select_foods(pool, k, limits, priority_mode, required=(), min_amounts=None, backend=None, cache=None):
+    """
+    Choose k foods from pool (including every food in required) and their portions.
+
+    limits and priority_mode are as for optimize(); min_amounts applies to required foods.
+    Returns optimize()'s OptimizeResult for the chosen foods, extended with 'foods',
+    'loss', 'candidates' (combinations scored) and 'search_elapsed' (seconds, excluding the final solves).
+    Raises ValueError if k is out of range or required has more than k foods.
+    """
+    if not MIN_FOODS <= k <= MAX_FOODS:
+        raise ValueError(f"k must be between {MIN_FOODS} and {MAX_FOODS}")
+    required = list(dict.fromkeys(required))
+    if len(required) > k:
+        raise ValueError(f"{len(required)} required foods do not fit in {k}")
+    min_amounts = min_amounts or {}
+
+    start = time.perf_counter()
+    limit_vec = np.array([float(limits[m]) for m in MACROS])
+    weights = priority_weights(priority_mode)
+    w = np.array([float(weights[m]) for m in MACROS])
+    G = pool.macros / (limit_vec + 1e-6)
+
+    required_idx = np.array([pool.name_to_row[food] for food in required], dtype=np.intp)
+    lower_all = np.zeros(len(pool))
+    lower_all[required_idx] = [float(min_amounts.get(food, 0.0)) for food in required]
+    exclude = np.zeros(len(pool), dtype=bool)
+    exclude[required_idx] = True
+    shortlist = _shortlist(G, w, exclude)
+
+    # Beam of combinations (rows of pool indexes), grown from the required foods
+    beam = required_idx[None, :]
+    scored = 0
+    while beam.shape[1] < k:
+        if len(shortlist) == 0:
+            break
+        combos = np.concatenate([
+            np.repeat(beam, len(shortlist), axis=0),
+            np.tile(shortlist, len(beam))[:, None],
+        ], axis=1)
+        combos = combos[~(combos[:, :-1] == combos[:, -1:]).any(axis=1)]
+        combos = np.unique(np.sort(combos, axis=1), axis=0)
+        losses = _fit(G[combos], w, lower_all[combos], np.full(combos.shape, float(MAX_PORTION_G)))
+        scored += len(combos)
+        beam = combos[np.argsort(losses, kind='stable')[:BEAM_WIDTH]]
+    search_elapsed = time.perf_counter() - start
+    METRICS.observe('selection_search_seconds', search_elapsed)
+
+    best = None
+    for combo in beam[:FINAL_SOLVES]:
+        foods = [pool.names[i] for i in combo]
+        result = optimize(foods, min_amounts, limits, priority_mode, pool.name_to_row, pool.nutrients,
+                          backend=backend, cache=cache)
+        result.foods = foods
+        result.loss = weighted_loss(result.total_res, limits, weights)
+        if best is None or (result.success, -result.loss) > (best.success, -best.loss):
+            best = result
+    if best is None:
+        raise ValueError("No foods with nutrient data to choose from.")
+    best.candidates = scored
+    best.search_elapsed = search_elapsed
+    return best
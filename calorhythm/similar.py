@@ -0,0 +1,69 @@
+"""
+Nearest-neighbour index over per-100 g nutrient vectors for the "4. Similar Foods" page.
+
+Answers "what is nutritionally closest to this food, but with less sodium?"
+without scanning the table per query. The index is a KD-tree (scipy.spatial.cKDTree)
+built once per data version over the six NUTRIENT_KEYS columns, each divided by
+its standard deviation so that Sodium (mg) does not outweigh grams and kcal.
+A query is a tree search for a few dozen neighbours; constraints on individual
+nutrients are applied to those, widening the search only if too few pass.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+from calorhythm.loader import NUTRIENT_KEYS
+
+# Neighbours fetched per wanted result on the first try, before any constraint is applied
+OVERFETCH = 4
+
+class SimilarFoodIndex:
+    """KD-tree over the scaled nutrient vectors of every distinct food name. Read-only once built."""
+
+    def __init__(self, name_to_row, nutrients):
+        self.names = list(name_to_row)
+        values = np.asarray(nutrients, dtype=np.float64)[list(name_to_row.values())]
+        self.values = values.reshape(len(self.names), len(NUTRIENT_KEYS))
+        self.values.setflags(write=False)
+        self.position = {name: i for i, name in enumerate(self.names)}
+
+        scale = self.values.std(axis=0) if len(self.names) else np.ones(len(NUTRIENT_KEYS))
+        scale[scale == 0] = 1.0
+        self.scale = scale
+        self.tree = cKDTree(self.values / scale) if len(self.names) else None
+
+    def __len__(self):
+        return len(self.names)
+
+    def _allowed(self, candidates, ranges):
+        keep = np.ones(len(candidates), dtype=bool)
+        for key, (low, high) in ranges.items():
+            values = self.values[candidates, NUTRIENT_KEYS.index(key)]
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+        return keep
+
+    def similar(self, food, k=10, ranges=None):
+        """
+        The k foods closest to food, as (name, distance) pairs, nearest first; food itself is excluded.
+        ranges maps nutrient keys to inclusive (low, high) bounds (None leaves a side open), as in
+        calorhythm.discovery.range_query. Distances are in standard deviations. Raises KeyError for
+        an unknown food.
+        """
+        i = self.position[food]
+        ranges = {key: bounds for key, bounds in (ranges or {}).items() if bounds != (None, None)}
+        point = self.values[i] / self.scale
+
+        fetch = min(len(self.names), (k + 1) * (OVERFETCH if ranges else 1))
+        while True:
+            distances, candidates = self.tree.query(point, k=fetch)
+            distances, candidates = np.atleast_1d(distances), np.atleast_1d(candidates)
+            keep = candidates != i
+            if ranges:
+                keep &= self._allowed(candidates, ranges)
+            if keep.sum() >= k or fetch == len(self.names):
+                break
+            fetch = min(len(self.names), fetch * 4)
+
+        return [(self.names[j], float(d)) for j, d in zip(candidates[keep][:k], distances[keep][:k])]
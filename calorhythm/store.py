@@ -0,0 +1,132 @@
+"""
+Compact, read-only food table shared by every session in the server process.
+
+load_data() used to be an st.cache_data function, which pickles the result and
+hands every caller its own float64/object copy. FoodStore is built once per
+data version, shared by every session (calorhythm.resources.load_store) and
+never copied:
+
+- nutrients: one C-contiguous float32 matrix (rows x NUTRIENT_KEYS), read-only
+- df: the display frame, whose nutrient columns are views of that matrix and
+  whose food names are a single Arrow UTF-8 buffer ('string[pyarrow]')
+- name_to_row: Food Name -> row position, the only per-row Python objects
+
+Per-row footprint on the bundled table (3,331 rows), see FoodStore.nbytes():
+nutrients 24 B, names 36 B and name_to_row 186 B, about 246 B held once per
+process. Previously each load_data() / load_food_index() call unpickled its own
+DataFrame (154 B/row) plus float64 matrix (48 B) and name_to_row (186 B).
+"""
+import threading
+import numpy as np
+import pandas as pd
+
+from calorhythm.loader import NUTRIENT_KEYS, build_food_index
+from calorhythm.metrics import deep_sizeof
+
+# float32 carries ~7 significant decimal digits; more than any RDA value has
+NUTRIENT_DTYPE = np.float32
+DISPLAY_DIGITS = 7
+
+class FoodStore:
+    """The cleaned table in compact, read-only form. Do not mutate any attribute."""
+
+    def __init__(self, df, cols_map):
+        self.cols_map = dict(cols_map)
+        self._rank_index = None
+        self._lock = threading.Lock()
+        name_col = cols_map.get('Food Name')
+        if df.empty or name_col is None:
+            self.name_to_row = {}
+            self.nutrients = np.empty((0, len(NUTRIENT_KEYS)), dtype=NUTRIENT_DTYPE)
+            self.df = pd.DataFrame()
+            return
+
+        self.name_to_row, self.nutrients = build_food_index(df, cols_map, dtype=NUTRIENT_DTYPE)
+        self.nutrients.setflags(write=False)
+
+        # Nutrient columns share the matrix's memory; names become one Arrow buffer.
+        # Column order matches parse_excel's (Food Name, then NUTRIENT_KEYS).
+        frame = pd.DataFrame(self.nutrients, columns=[cols_map[key] for key in NUTRIENT_KEYS], copy=False)
+        frame.insert(0, name_col, df[name_col].astype('string[pyarrow]').array)
+        self.df = frame
+
+    def __len__(self):
+        return len(self.df)
+
+    # Queries shared with calorhythm.database.SQLiteFoodTable. Frames hold the Food Name
+    # column plus the nutrient columns of keys, labelled as in load_data()'s df.
+
+    @property
+    def rank_index(self):
+        """Sorted-order indexes over the nutrient matrix (see calorhythm.discovery), built on first use."""
+        if self._rank_index is None:
+            with self._lock:
+                if self._rank_index is None:
+                    from calorhythm.discovery import build_rank_index
+
+                    rank_index = build_rank_index(self.nutrients)
+                    for entry in rank_index.values():
+                        for array in entry.values():
+                            array.setflags(write=False)
+                    self._rank_index = rank_index
+        return self._rank_index
+
+    def warm_from(self, other):
+        """Prebuild the lazy indexes other has already built (before a hot-reload swap)."""
+        if getattr(other, '_rank_index', None) is not None:
+            self.rank_index
+
+    def names(self):
+        """Distinct food names in table order (first occurrence)."""
+        return list(self.name_to_row)
+
+    def head(self, n=5):
+        return self.df.head(n)
+
+    def lookup(self, foods):
+        """(name_to_row, nutrients) covering foods. In memory, these are the shared full-table structures."""
+        return self.name_to_row, self.nutrients
+
+    def _frame(self, rows, keys):
+        columns = list(dict.fromkeys([self.cols_map['Food Name']] + [self.cols_map[key] for key in keys]))
+        return self.df.iloc[rows][columns].reset_index(drop=True)
+
+    def top_k(self, key, k, largest=True, keys=()):
+        """The k foods highest (or lowest) in nutrient key; ties keep table order, like nlargest/nsmallest."""
+        from calorhythm.discovery import top_k
+
+        return self._frame(top_k(self.rank_index, key, k, largest), keys)
+
+    def filter(self, ranges, sort_key, limit, keys=()):
+        """
+        (number of foods satisfying every (low, high) bound in ranges, the first limit of them
+        sorted by sort_key descending). Bounds are inclusive; None leaves a side open.
+        """
+        from calorhythm.discovery import order_by, range_query
+
+        rows = range_query(self.rank_index, self.nutrients, ranges)
+        return len(rows), self._frame(order_by(self.rank_index, sort_key, rows)[:limit], keys)
+
+    def nbytes(self):
+        """Bytes held by each component, for the documentation and the admin page."""
+        name_col = self.cols_map.get('Food Name')
+        return {
+            'nutrients': self.nutrients.nbytes,
+            'names': int(self.df[name_col].memory_usage(deep=True, index=False)) if name_col in self.df else 0,
+            'name_to_row': deep_sizeof(self.name_to_row),
+        }
+
+def display_frame(df):
+    """
+    Copy of a (small) slice of FoodStore.df for display, with float32 columns
+    widened to float64 and rounded to DISPLAY_DIGITS significant digits, so
+    e.g. 66.66 is shown as 66.66 rather than 66.660004.
+    """
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == NUTRIENT_DTYPE:
+            values = out[col].to_numpy(dtype=np.float64)
+            magnitude = np.floor(np.log10(np.abs(values), out=np.zeros_like(values), where=values != 0))
+            factor = 10.0 ** (DISPLAY_DIGITS - 1 - magnitude)
+            out[col] = np.round(values * factor) / factor
+    return out
@@ -0,0 +1,80 @@
+"""
+Parameter sweeps for the Quantity Optimizer: solve the same ingredients over a
+whole grid of limits and/or priority weights in one batch, to show the
+trade-off between them (e.g. protein fulfillment vs the calorie limit).
+
+Grid points are visited in serpentine order, so consecutive points differ in
+one parameter by one step, and every solve is warm-started from the previous
+point's solution (SLSQP start point or BVLS dual multipliers). A point whose
+warm-started solve fails is retried cold.
+"""
+import time
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from calorhythm.metrics import METRICS, record_solve
+from calorhythm.optimizer import MACROS, build_problem, priority_weights, solve_portions, summarize
+
+# Sweepable parameters: 'limit_<macro>' and 'weight_<macro>'
+SWEEP_PARAMS = [f'limit_{m}' for m in MACROS] + [f'weight_{m}' for m in MACROS]
+
+def grid_points(grid):
+    """
+    Every combination of the values in grid (param -> values), in serpentine order:
+    the last parameter runs back and forth so that neighbours in the list are neighbours in the grid.
+    """
+    points = [{}]
+    for param, values in grid.items():
+        values = list(values)
+        points = [dict(point, **{param: value})
+                  for i, point in enumerate(points)
+                  for value in (values if i % 2 == 0 else values[::-1])]
+    return points
+
+def sweep(foods, min_amounts, limits, priority_mode, name_to_row, nutrients, grid, backend=None, warm=True):
+    """
+    Solve foods at every point of grid (see grid_points; keys from SWEEP_PARAMS).
+    limits and priority_mode give the values of the parameters that are not swept.
+    With warm=False every point is a cold solve, for comparison.
+
+    Returns an OptimizeResult with 'points' (one dict per grid point, in solve order:
+    'params', 'x', 'success', 'nit', 'nfev', 'elapsed', 'total_res', 'percentages'),
+    'elapsed' (seconds for the whole sweep), 'nit', 'nfev', 'failures' and 'backend'.
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(SWEEP_PARAMS)}")
+
+    A = build_problem(foods, name_to_row, nutrients)
+    lower = [float(min_amounts.get(food, 0.0)) for food in foods]
+    base_weights = priority_weights(priority_mode)
+
+    start = time.perf_counter()
+    points, warm_start = [], None
+    for params in grid_points(grid):
+        point_limits = {m: float(params.get(f'limit_{m}', limits[m])) for m in MACROS}
+        weights = {m: float(params.get(f'weight_{m}', base_weights[m])) for m in MACROS}
+        args = (A, [point_limits[m] for m in MACROS], [weights[m] for m in MACROS], lower)
+        result = solve_portions(*args, backend=backend, warm_start=warm_start)
+        if not result.success and warm_start is not None:
+            # A warm start should never cost a solution: retry this point cold
+            warm_elapsed = result.elapsed
+            result = solve_portions(*args, backend=backend)
+            result.elapsed += warm_elapsed
+        record_solve(result, foods, point_limits, priority_mode)
+        if warm and result.success:
+            warm_start = result.warm_state
+        total_res, percentages = summarize(A, result.x, point_limits)
+        points.append({
+            'params': params, 'x': result.x, 'success': bool(result.success),
+            'nit': result.get('nit'), 'nfev': result.get('nfev'), 'elapsed': result.elapsed,
+            'total_res': total_res, 'percentages': percentages,
+        })
+    elapsed = time.perf_counter() - start
+    METRICS.observe('sweep_seconds', elapsed)
+
+    return OptimizeResult(
+        points=points, elapsed=elapsed, backend=result.backend if points else backend,
+        nit=int(np.sum([p['nit'] or 0 for p in points])), nfev=int(np.sum([p['nfev'] or 0 for p in points])),
+        failures=sum(not p['success'] for p in points),
+    )
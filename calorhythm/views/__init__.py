@@ -0,0 +1,17 @@
+"""
+Streamlit pages. Each module exposes render() and is imported only when its
+page is first visited, so e.g. SciPy is never loaded for Home or Food Discovery.
+"""
+
+# Sidebar label -> page module
+PAGES = {
+    "Home": "calorhythm.views.home",
+    "1. Nutrition Calculator": "calorhythm.views.calculator",
+    "2. Quantity Optimizer": "calorhythm.views.optimizer",
+    "3. Food Discovery": "calorhythm.views.discovery",
+    "4. Similar Foods": "calorhythm.views.similar",
+    "5. Meal Plan": "calorhythm.views.mealplan",
+}
+
+# Not listed in the sidebar; opened with main.py?admin=1
+ADMIN_PAGE = "calorhythm.views.admin"
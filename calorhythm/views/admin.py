@@ -0,0 +1,90 @@
+"""
+Hidden operator page (main.py?admin=1): hot-path timings, solver statistics and cache hit rates.
+
+Anyone who knows the URL can read the metrics. Reloading data and resetting the
+metrics require the token in CALORHYTHM_ADMIN_TOKEN; without it they are disabled.
+"""
+import os
+import hmac
+import time
+import streamlit as st
+import pandas as pd
+
+from calorhythm.metrics import METRICS, resident_memory_bytes
+from calorhythm.resources import get_reloader, current_snapshot
+
+ADMIN_TOKEN = os.environ.get('CALORHYTHM_ADMIN_TOKEN')
+
+def _authorized():
+    """Whether this session entered CALORHYTHM_ADMIN_TOKEN (never, when it is not set)."""
+    if not ADMIN_TOKEN:
+        st.caption("Set `CALORHYTHM_ADMIN_TOKEN` to enable reloading data and resetting metrics.")
+        return False
+    token = st.text_input("Admin token", type="password", key="admin_token")
+    if token and not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        st.error("Invalid admin token.")
+    return bool(token) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def render():
+    st.header("🛠️ Operator Metrics")
+    st.markdown("Metrics of **this server process** since it started. "
+                "Set `CALORHYTHM_METRICS_PORT` to scrape the same data with Prometheus.")
+
+    rss = resident_memory_bytes()
+    snapshot = METRICS.snapshot()
+    solves = sum(r['count'] for r in snapshot if r['metric'] == 'solves_total')
+    failures = sum(r['count'] for r in snapshot if r['metric'] == 'solves_total' and r['labels'].get('status') == 'failure')
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Resident Memory", f"{rss / 2**20:.0f} MiB" if rss is not None else "n/a")
+    c2.metric("Optimizer Solves", solves)
+    c3.metric("Failed Solves", failures)
+    authorized = _authorized()
+
+    data = current_snapshot()
+    store = data.store
+    loaded_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data.loaded_at))
+    st.caption(f"Data version {data.version}, loaded {loaded_at}"
+               + (f" · ⚠️ {data.error}" if data.error else ""))
+    if authorized and st.button("Reload Data Now"):
+        # Runs in the background; this and every other session keep the current version until the swap
+        get_reloader().request_reload()
+        st.toast("Reload started in the background.")
+    if len(store):
+        footprint = store.nbytes()
+        st.caption(f"Shared food store: {len(store):,} rows, {sum(footprint.values()) / 2**20:.1f} MiB "
+                   f"({' · '.join(f'{k} {v / len(store):.0f} B/row' for k, v in footprint.items())})")
+
+    # Cache hit rates
+    requests = {}
+    for r in snapshot:
+        if r['metric'] == 'cache_requests_total':
+            requests.setdefault(r['labels']['cache'], {'hit': 0, 'miss': 0})[r['labels']['result']] = r['count']
+    if requests:
+        st.subheader("Cache Hit Rates")
+        cache_df = pd.DataFrame.from_dict(requests, orient='index')
+        cache_df['Hit Rate (%)'] = 100 * cache_df['hit'] / (cache_df['hit'] + cache_df['miss'])
+        st.dataframe(cache_df, use_container_width=True)
+
+    # Timings and solver statistics (summaries)
+    summaries = [r for r in snapshot if 'mean' in r]
+    if summaries:
+        st.subheader("Timings and Distributions")
+        st.caption("Seconds for *_seconds metrics, bytes for session_state_bytes; quantiles over the last 1,024 observations.")
+        st.dataframe(pd.DataFrame([
+            {'Metric': r['metric'], 'Labels': ', '.join(f"{k}={v}" for k, v in r['labels'].items()),
+             'Count': r['count'], 'Mean': r['mean'], 'p50': r['p50'], 'p95': r['p95'], 'p99': r['p99'], 'Max': r['max']}
+            for r in summaries
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No observations yet.")
+
+    st.subheader("Prometheus Export")
+    text = METRICS.prometheus_text()
+    st.download_button("Download metrics.txt", text, file_name="metrics.txt", mime="text/plain")
+    with st.expander("Show text"):
+        st.code(text, language=None)
+
+    if authorized and st.button("Reset Metrics"):
+        METRICS.reset()
+        st.rerun()
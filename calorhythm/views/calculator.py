@@ -0,0 +1,140 @@
+"""Menu 1: Nutrition Calculator."""
+import streamlit as st
+import numpy as np
+import pandas as pd
+import altair as alt
+
+from calorhythm.loader import NUTRIENT_KEYS, DAILY_STANDARDS
+from calorhythm.metrics import timed
+from calorhythm.resources import load_table, current_snapshot
+from calorhythm.views.state import fragment, memoized, session_memo
+from calorhythm.views.widgets import food_search_select
+
+def render():
+    table = load_table()
+
+    st.header("🍽️ Nutrition Calculator (Absolute Amount)")
+    st.markdown("""
+    Select food items and input quantities to compare your intake with **Korean Daily Nutritional Standards (g)**.
+    """)
+    
+    if not len(table):
+        st.warning("Data is missing.")
+    else:
+        render_calculator(current_snapshot())
+
+@fragment('calculator')
+def render_calculator(snapshot):
+    """Search, quantities and results; a widget change reruns only this section."""
+    table, data_version = snapshot.store, snapshot.version
+    # 1. Search Food
+    selected_foods = food_search_select(
+        "Search food items:",
+        key="calc_multiselect",
+        placeholder="e.g., 쌀밥, 김치, ㄱㅊ, gimchi...",
+        snapshot=snapshot,
+    )
+
+    if selected_foods:
+        st.divider()
+        st.subheader("📝 Input Quantity (g)")
+        
+        food_amounts = {}
+        cols = st.columns(2)
+        for i, food in enumerate(selected_foods):
+            with cols[i % 2]:
+                amount = st.number_input(
+                    f"🔹 {food} (g)", 
+                    min_value=0, 
+                    value=100, 
+                    step=10, 
+                    key=f"food_{i}"
+                )
+                food_amounts[food] = amount
+        
+        st.write("") 
+        
+        # 2. Calculate Button
+        # Results stay up while the inputs are unchanged, and are then redrawn from session state
+        analysis_key = (data_version, tuple(food_amounts.items()))
+        clicked = st.button("Start Analysis 🧮", type="primary")
+        if clicked or memoized('calculator_totals', analysis_key) is not None:
+            def compute_totals():
+                # Calculation Logic: one gather + one dot product over the nutrient matrix
+                name_to_row, nutrients = table.lookup(list(food_amounts))
+                # A food picked before a data reload may be gone from this version
+                known = [food for food in food_amounts if food in name_to_row]
+                missing = [food for food in food_amounts if food not in name_to_row]
+                rows = [name_to_row[food] for food in known]
+                ratios = np.array([food_amounts[food] for food in known], dtype=np.float64) / 100.0
+                return ratios @ nutrients[rows].reshape(len(rows), len(NUTRIENT_KEYS)), missing
+
+            totals, missing = session_memo('calculator_totals', analysis_key, compute_totals)
+            if missing:
+                st.warning(f"⚠️ Not in the current data, left out: {', '.join(missing)}")
+
+            total_cal = totals[NUTRIENT_KEYS.index('Energy')]
+            total_carb = totals[NUTRIENT_KEYS.index('Carbohydrate')]
+            total_prot = totals[NUTRIENT_KEYS.index('Protein')]
+            total_fat = totals[NUTRIENT_KEYS.index('Fat')]
+
+            st.divider()
+            st.subheader("📊 Analysis Results")
+            
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Total Energy", f"{total_cal:.0f} kcal")
+            c2.metric("Carbohydrates", f"{total_carb:.1f} g")
+            c3.metric("Protein", f"{total_prot:.1f} g")
+            c4.metric("Fat", f"{total_fat:.1f} g")
+            
+            # Standards
+            std_carb = DAILY_STANDARDS['Carbohydrate']
+            std_prot = DAILY_STANDARDS['Protein']
+            std_fat = DAILY_STANDARDS['Fat']
+            
+            st.write("### ⚖️ Intake vs. Daily Standard (g)")
+            
+            def build_chart():
+                # Prepare Data
+                chart_df = pd.DataFrame({
+                    'My Intake (g)': [total_carb, total_prot, total_fat],
+                    'Daily Standard (g)': [std_carb, std_prot, std_fat]
+                }, index=['Carbohydrate', 'Protein', 'Fat'])
+
+                # Altair Chart
+                with timed('chart_build_seconds', chart='calculator'):
+                    chart_df_melted = chart_df.reset_index().melt('index', var_name='Category', value_name='Amount(g)')
+
+                    return alt.Chart(chart_df_melted).mark_bar().encode(
+                        x=alt.X('index', title=None, axis=alt.Axis(labelAngle=0)),
+                        y=alt.Y('Amount(g)'),
+                        color='Category',
+                        xOffset='Category'
+                    ).properties(height=350)
+
+            chart = session_memo('calculator_chart', analysis_key, build_chart)
+            st.altair_chart(chart, use_container_width=True)
+            
+            # Feedback
+            st.info(f"""
+            **ℹ️ Reference Standards (Adult Daily)** - **Carbs:** {std_carb}g 
+            - **Protein:** {std_prot}g 
+            - **Fat:** {std_fat}g 
+            *(Source: MFDS)*
+            """)
+
+            if total_carb > std_carb:
+                st.warning(f"⚠️ Carbs exceed standard by **{total_carb - std_carb:.1f}g**.")
+            else:
+                st.warning(f"⚠️ Carbs are **{-total_carb + std_carb:.1f}g** below standard.")
+            if total_prot > std_prot:
+                st.warning(f"⚠️ Protein exceeds standard by **{-std_prot + total_prot:.1f}g**.")
+            else:
+                st.warning(f"⚠️ Protein is **{std_prot - total_prot:.1f}g** below standard.")
+            if total_fat > std_fat:
+                st.warning(f"⚠️ Fat exceeds standard by **{total_fat - std_fat:.1f}g**.")
+            else:
+                st.warning(f"⚠️ Fat is **{- total_fat + std_fat:.1f}g** below standard.")
+
+    else:
+        st.info("👆 Please select food items first.")
@@ -0,0 +1,109 @@
+"""Menu 3: Food Discovery."""
+import streamlit as st
+
+from calorhythm.loader import NUTRIENT_KEYS, NUTRIENT_UNITS
+from calorhythm.metrics import timed
+from calorhythm.store import display_frame
+from calorhythm.resources import load_table, current_snapshot
+from calorhythm.views.state import fragment, session_memo
+
+def render():
+    table = load_table()
+
+    st.header("🔍 Food Discovery by Nutrient")
+    st.markdown("Find foods with the **highest** and **lowest** nutrient content, or filter by several nutrients at once (Per 100g).")
+
+    if not len(table):
+        st.warning("Data not loaded.")
+    else:
+        discovery_mode = st.radio("🔎 Mode:", ["Ranking", "Multi-Nutrient Filter"], horizontal=True)
+        st.divider()
+
+        # Each mode is a fragment: its widgets rerun only that section, on this rerun's snapshot
+        if discovery_mode == "Ranking":
+            render_ranking(current_snapshot())
+        else:
+            render_filter(current_snapshot())
+
+@fragment('discovery_ranking')
+def render_ranking(snapshot):
+    table, data_version = snapshot.store, snapshot.version
+    cols_map = table.cols_map
+    col1, col2 = st.columns(2)
+    with col1:
+        nutrient_select = st.radio(
+            "⚖️ Select Nutrient:",
+            NUTRIENT_KEYS,
+            index=NUTRIENT_KEYS.index("Carbohydrate"),
+            horizontal=True
+        )
+        # Use English keys directly
+        target_key = nutrient_select
+
+    with col2:
+        rank_count = st.slider("📊 Ranking Count:", 3, 100, 10)
+
+    target_col = cols_map[target_key]
+    display_keys = [target_key, 'Energy']
+
+    def build_tables():
+        # Top/bottom-k: slices of the precomputed sort order, or indexed queries on the database
+        df_high = display_frame(table.top_k(target_key, rank_count, keys=display_keys))
+        df_high.index = df_high.index + 1
+        df_low = display_frame(table.top_k(target_key, rank_count, largest=False, keys=display_keys))
+        df_low.index = df_low.index + 1
+
+        # Styling the gradient tables is the page's charting cost
+        with timed('chart_build_seconds', chart='discovery_ranking'):
+            return (df_high.style.background_gradient(subset=[target_col], cmap="Reds"),
+                    df_low.style.background_gradient(subset=[target_col], cmap="Blues"))
+
+    styled_high, styled_low = session_memo('discovery_ranking', (data_version, target_key, rank_count), build_tables)
+
+    st.divider()
+    col_high, col_low = st.columns(2)
+
+    with col_high:
+        st.subheader(f"⬆️ Top {rank_count} High in {nutrient_select}")
+        st.dataframe(styled_high, use_container_width=True)
+
+    with col_low:
+        st.subheader(f"⬇️ Top {rank_count} Low in {nutrient_select}")
+        st.dataframe(styled_low, use_container_width=True)
+
+    st.info(f"💡 **Tip**: Useful for finding {nutrient_select}-rich or {nutrient_select}-low foods.")
+
+@fragment('discovery_filter')
+def render_filter(snapshot):
+    table, data_version = snapshot.store, snapshot.version
+    filter_keys = st.multiselect(
+        "⚖️ Filter by Nutrients:",
+        NUTRIENT_KEYS,
+        default=["Protein", "Fat", "Sodium"]
+    )
+
+    ranges = {}
+    filter_cols = st.columns(max(len(filter_keys), 1))
+    for i, key in enumerate(filter_keys):
+        with filter_cols[i]:
+            unit = NUTRIENT_UNITS[key]
+            low = st.number_input(f"{key} ≥ ({unit})", min_value=0.0, value=None, key=f"range_min_{key}")
+            high = st.number_input(f"{key} ≤ ({unit})", min_value=0.0, value=None, key=f"range_max_{key}")
+            ranges[key] = (low, high)
+
+    sort_key = st.selectbox("📊 Sort by:", filter_keys or NUTRIENT_KEYS)
+    rank_count = st.slider("📊 Result Count:", 3, 100, 20)
+
+    def run_filter():
+        match_count, df_match = table.filter(ranges, sort_key, rank_count, keys=filter_keys + ['Energy'])
+        df_match = display_frame(df_match)
+        df_match.index = df_match.index + 1
+        return match_count, df_match
+
+    match_count, df_match = session_memo(
+        'discovery_filter', (data_version, tuple(ranges.items()), sort_key, rank_count), run_filter)
+
+    st.divider()
+    st.subheader(f"✅ {match_count} foods match (showing {len(df_match)})")
+    st.dataframe(df_match, use_container_width=True)
+    st.info("💡 **Tip**: Leave a bound empty to keep that side open, e.g. Protein ≥ 20 g, Fat ≤ 5 g, Sodium ≤ 300 mg.")
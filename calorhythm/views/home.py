@@ -0,0 +1,18 @@
+"""Home Screen."""
+import streamlit as st
+
+from calorhythm.resources import load_table
+from calorhythm.store import display_frame
+
+def render():
+    table = load_table()
+
+    st.write("### Welcome to CaloRhythm!")
+    st.info("👈 Select a feature from the left sidebar.")
+    
+    if len(table):
+        st.success(f"✅ Data loaded successfully! ({len(table)} food items)")
+        with st.expander("📊 Dataset Preview (Top 5)"):
+            st.dataframe(display_frame(table.head()))
+    else:
+        st.error("⚠️ Failed to load data.")
@@ -0,0 +1,115 @@
+"""Menu 5: Meal Plan (multi-day totals vs daily standards)."""
+import pandas as pd
+import streamlit as st
+import altair as alt
+
+from calorhythm.loader import DAILY_STANDARDS
+from calorhythm.metrics import timed
+from calorhythm.resources import load_table, current_snapshot
+from calorhythm.views.state import session_memo
+
+def render():
+    table = load_table()
+
+    st.header("📅 Meal Plan (Weekly Totals)")
+    st.markdown("""
+    Upload a multi-day meal plan to get the totals of every **meal**, **day** and **week**,
+    and how far each day and week is from the **Korean Daily Nutritional Standards (g)**.
+    """)
+
+    try:
+        from calorhythm.mealplan import PLAN_COLUMNS, read_plan, iter_plan_totals
+    except ImportError:
+        st.error("scipy library required.")
+        st.stop()
+
+    if not len(table):
+        st.warning("Data not loaded.")
+        return
+
+    foods = table.head(3)[table.cols_map['Food Name']].tolist()
+    sample = pd.DataFrame({
+        'day': [1, 1, 1, 2],
+        'meal': ['breakfast', 'breakfast', 'lunch', 'breakfast'],
+        'food': [foods[0], foods[-1], foods[0], foods[0]],
+        'grams': [200, 100, 150, 200],
+    })
+    st.markdown(f"CSV columns: `{', '.join(PLAN_COLUMNS)}` - one line per food eaten. "
+                "`day` is a day number (days 1-7 are week 1) or a date; list the plan day by day.")
+    st.download_button("Download sample plan", sample.to_csv(index=False), file_name="meal_plan_sample.csv", mime="text/csv")
+
+    uploaded = st.file_uploader("Upload a meal plan (CSV):", type=['csv'])
+    if uploaded is None:
+        st.info("👆 Please upload a meal plan.")
+        return
+
+    def aggregate():
+        uploaded.seek(0)
+        batches = {'meal': [], 'day': [], 'week': []}
+        totals = iter_plan_totals(read_plan(uploaded), table.lookup)
+        while True:
+            try:
+                level, frame = next(totals)
+            except StopIteration as stop:
+                aggregator = stop.value
+                break
+            batches[level].append(frame)
+        frames = {level: pd.concat(frames, ignore_index=True) for level, frames in batches.items()}
+        return frames, aggregator.entries, aggregator.invalid, aggregator.unknown
+
+    try:
+        frames, entries, invalid, unknown = session_memo(
+            'meal_plan', (current_snapshot().version, uploaded.file_id), aggregate)
+    except (ValueError, KeyError) as e:
+        st.error(f"Error: {e}")
+        return
+    meals, days, weeks = frames['meal'], frames['day'], frames['week']
+    if not len(days):
+        st.warning("The plan has no entries.")
+        return
+
+    st.divider()
+    st.subheader("📊 Plan Summary")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Entries", f"{entries:,}")
+    c2.metric("Meals", f"{len(meals):,}")
+    c3.metric("Days", f"{len(days):,}")
+    c4.metric("Weeks", f"{len(weeks):,}")
+    if unknown:
+        listed = ', '.join(str(food) for food in list(unknown)[:10])
+        st.warning(f"⚠️ {sum(unknown.values()):,} entries with unknown foods were skipped: {listed}"
+                   + (" ..." if len(unknown) > 10 else ""))
+    if invalid:
+        st.warning(f"⚠️ {invalid:,} entries without grams were skipped.")
+
+    st.write("### ⚖️ Average Daily Intake vs. Daily Standard (%)")
+    with timed('chart_build_seconds', chart='meal_plan'):
+        chart_df = pd.DataFrame([
+            {'Week': week, 'Nutrient': key, 'Of Standard(%)': total / days_in_week / standard * 100}
+            for week, days_in_week, *values in weeks[['week', 'days', *DAILY_STANDARDS]].itertuples(index=False)
+            for (key, standard), total in zip(DAILY_STANDARDS.items(), values)
+        ])
+        bars = alt.Chart(chart_df).mark_bar().encode(
+            x=alt.X('Week:N', sort=None, axis=alt.Axis(labelAngle=0)),
+            y=alt.Y('Of Standard(%)'),
+            color='Nutrient',
+            xOffset='Nutrient',
+            tooltip=['Week', 'Nutrient', alt.Tooltip('Of Standard(%)', format='.1f')]
+        )
+        standard_rule = alt.Chart(pd.DataFrame({'y': [100]})).mark_rule(strokeDash=[4, 4]).encode(y='y')
+    st.altair_chart((bars + standard_rule).properties(height=350), use_container_width=True)
+
+    st.write("### 🗓️ Weeks")
+    st.dataframe(weeks.round(1), use_container_width=True, hide_index=True)
+    st.write("### 📆 Days")
+    st.dataframe(days.round(1), use_container_width=True, hide_index=True)
+
+    standards = ', '.join(f"{key} {value:g} g" for key, value in DAILY_STANDARDS.items())
+    st.info(f"💡 **Tip**: '... vs Standard' columns are totals minus the daily standard ({standards}) "
+            "times the number of days, so negative values are below the standard.")
+
+    c1, c2, c3 = st.columns(3)
+    for column, (level, frame) in zip([c1, c2, c3], frames.items()):
+        with column:
+            st.download_button(f"Download {level} totals", frame.to_csv(index=False),
+                               file_name=f"meal_plan_{level}s.csv", mime="text/csv", key=f"plan_download_{level}")
@@ -0,0 +1,259 @@
+"""Menu 2: Ingredient Quantity Optimizer."""
+import math
+import numpy as np
+import streamlit as st
+import pandas as pd
+import altair as alt
+
+from calorhythm.metrics import timed
+from calorhythm.resources import load_table, load_candidate_pool, current_snapshot
+from calorhythm.views.state import fragment, memoized, session_memo
+from calorhythm.views.widgets import food_search_select
+
+@st.cache_resource(max_entries=2)
+def get_result_cache(data_version):
+    """Optimizer results shared by every session in this process, for one data version."""
+    from calorhythm.optimizer import ResultCache
+
+    return ResultCache()
+
+def render():
+    table = load_table()
+
+    st.header("⚖️ AI Diet Optimizer")
+    st.markdown("""
+    Calculates optimal ingredient ratios based on **Limits**, **Minimum Intake**, and **Priorities**.
+    """)
+
+    try:
+        import calorhythm.optimizer, calorhythm.selection, calorhythm.sweep  # noqa: F401 (SciPy loads here)
+    except ImportError:
+        st.error("scipy library required.")
+        st.stop()
+
+    if not len(table):
+        st.warning("Data not loaded.")
+    else:
+        render_optimizer(current_snapshot())
+
+@fragment('optimizer')
+def render_optimizer(snapshot):
+    """Limits, ingredients, priority and results; a widget change reruns only this section."""
+    table, data_version = snapshot.store, snapshot.version
+    from calorhythm.optimizer import DEFAULT_LIMITS, PRIORITY_MODES, SOLVER_BACKEND, optimize
+    from calorhythm.selection import MIN_FOODS, MAX_FOODS, select_foods
+
+    st.divider()
+
+    # 1. Constraints
+    st.subheader("🎯 Nutritional Limits (per meal)")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1: limit_cal = st.number_input("Calories (kcal)", value=DEFAULT_LIMITS['cal'], step=50.0)
+    with col2: limit_carb = st.number_input("Carbohydrates (g)", value=DEFAULT_LIMITS['carb'], step=10.0)
+    with col3: limit_prot = st.number_input("Protein (g)", value=DEFAULT_LIMITS['prot'], step=5.0)
+    with col4: limit_fat = st.number_input("Fat (g)", value=DEFAULT_LIMITS['fat'], step=5.0)
+
+    # 2. Select Ingredients
+    st.divider()
+    auto_select = st.toggle("🤖 Auto-select foods from the whole database")
+    food_count = st.slider("Number of foods:", MIN_FOODS, MAX_FOODS, 3) if auto_select else None
+    selected_foods_opt = food_search_select(
+        "Search ingredients (must include):" if auto_select else "Search ingredients:",
+        key="opt_multiselect",
+        placeholder="e.g., 닭가슴살, 고구마, dakgaseum...",
+        snapshot=snapshot,
+    )
+
+    if not (selected_foods_opt or auto_select):
+        st.info("👆 Please select food items.")
+        return
+
+    st.markdown("##### 🔽 Minimum Intake (g)")
+    min_amounts = {}
+    min_cols = st.columns(3)
+    for i, food in enumerate(selected_foods_opt):
+        with min_cols[i % 3]:
+            min_val = st.number_input(f"{food} Min", min_value=0.0, step=10.0, key=f"min_{food}")
+            min_amounts[food] = min_val
+
+    st.divider()
+
+    st.subheader("⭐ Priority Settings")
+    priority_mode = st.radio(
+        "Select Priority:",
+        PRIORITY_MODES,
+        horizontal=True
+    )
+
+    limits = {'cal': limit_cal, 'carb': limit_carb, 'prot': limit_prot, 'fat': limit_fat}
+    # Results stay up while the inputs are unchanged, and are then redrawn from session state
+    solve_key = (data_version, food_count, tuple(selected_foods_opt), tuple(min_amounts.items()),
+                 tuple(limits.items()), priority_mode, SOLVER_BACKEND)
+    clicked = st.button("Calculate Optimal Ratios 🧩", type="primary")
+    if clicked or memoized('optimizer_solve', solve_key) is not None:
+        def solve():
+            cache = get_result_cache(data_version)
+            if auto_select:
+                # Shortlist and beam search over every food, then exact solves of the best few
+                result = select_foods(load_candidate_pool(snapshot), food_count, limits, priority_mode,
+                                      required=selected_foods_opt, min_amounts=min_amounts, cache=cache)
+                solve_note = f"searched {result.candidates:,} combinations in {result.search_elapsed * 1000:.0f} ms"
+                return result, result.foods, solve_note
+
+            # Warm start from the previous solve when only limits/minimums/priority changed
+            previous = st.session_state.get('opt_warm_start')
+            warm_key = (tuple(sorted(selected_foods_opt)), SOLVER_BACKEND)
+            warm_start = previous['state'] if previous and previous['key'] == warm_key else None
+
+            name_to_row, nutrients = table.lookup(selected_foods_opt)
+            result = optimize(selected_foods_opt, min_amounts, limits, priority_mode, name_to_row, nutrients,
+                              warm_start=warm_start, cache=cache)
+            st.session_state['opt_warm_start'] = {'key': result.warm_key, 'state': result.warm_state}
+            if result.cached:
+                solve_note = "cached"
+            else:
+                solve_note = f"{result.elapsed * 1000:.1f} ms" + (" · warm start" if result.warm_started else "")
+            return result, list(selected_foods_opt), solve_note
+
+        try:
+            result, foods, solve_note = session_memo('optimizer_solve', solve_key, solve)
+            st.caption(f"Solver: `{result.backend}` · {solve_note}")
+            n_items = len(foods)
+
+            final_weights = result.x
+            if any(math.isnan(v) for v in final_weights):
+                st.error("⚠️ Error: Conflicting constraints.")
+
+            elif result.success:
+                st.success(f"✅ Optimization Successful! ({priority_mode})")
+
+                cols = st.columns(n_items)
+
+                for idx, (weight, food) in enumerate(zip(final_weights, foods)):
+                    with cols[idx % n_items]:
+                        st.info(f"**{food}**")
+                        st.markdown(f"## {weight:.0f} g")
+
+                total_res = result.total_res
+                percentages = result.percentages
+
+                st.divider()
+
+                def build_chart():
+                    chart_df = pd.DataFrame({
+                        'Nutrient': ['Calories', 'Carbohydrate', 'Protein', 'Fat'],
+                        'Fulfillment(%)': percentages
+                    })
+
+                    # Highlighting
+                    if "Protein" in priority_mode:
+                        chart_df.loc[chart_df['Nutrient']=='Protein', 'Color'] = '#FF4B4B'
+                    elif "Carbs" in priority_mode:
+                        chart_df.loc[chart_df['Nutrient']=='Carbohydrate', 'Color'] = '#FF4B4B'
+                    else:
+                        chart_df['Color'] = '#4CAF50'
+
+                    # Altair Chart
+                    with timed('chart_build_seconds', chart='optimizer'):
+                        return alt.Chart(chart_df).mark_bar().encode(
+                            x=alt.X('Nutrient', title=None, axis=alt.Axis(labelAngle=0)),
+                            y=alt.Y('Fulfillment(%)', scale=alt.Scale(domain=[0, 100])),
+                            color=alt.Color('Nutrient', legend=None) if 'Color' not in chart_df else alt.value('#4CAF50'),
+                            tooltip=['Nutrient', alt.Tooltip('Fulfillment(%)', format='.1f')]
+                        ).properties(height=350)
+
+                chart_opt = session_memo('optimizer_chart', solve_key, build_chart)
+                st.altair_chart(chart_opt, use_container_width=True)
+
+                display_df = pd.DataFrame({
+                    'Current Intake': [total_res['cal'], total_res['carb'], total_res['prot'], total_res['fat']],
+                    'Set Limit': [limit_cal, limit_carb, limit_prot, limit_fat],
+                    'Fulfillment(%)': percentages
+                }, index=['Calories', 'Carbohydrate', 'Protein', 'Fat'])
+
+                st.table(display_df.style.format("{:.1f}"))
+
+            else:
+                st.warning("⚠️ Could not find optimal solution.")
+
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+    if selected_foods_opt and not auto_select:
+        render_sweep(snapshot, selected_foods_opt, min_amounts, limits, priority_mode)
+
+# Sweep parameter -> label
+SWEEP_LABELS = {
+    'limit_cal': "Calorie Limit (kcal)", 'limit_carb': "Carbohydrate Limit (g)",
+    'limit_prot': "Protein Limit (g)", 'limit_fat': "Fat Limit (g)",
+    'weight_cal': "Calorie Weight", 'weight_carb': "Carbohydrate Weight",
+    'weight_prot': "Protein Weight", 'weight_fat': "Fat Weight",
+}
+
+@fragment('optimizer_sweep')
+def render_sweep(snapshot, foods, min_amounts, limits, priority_mode):
+    """Solve the selected foods over a range of one limit or weight, warm-started point to point."""
+    table, data_version = snapshot.store, snapshot.version
+    from calorhythm.optimizer import PRIORITY_WEIGHT, SOLVER_BACKEND
+    from calorhythm.sweep import sweep
+
+    with st.expander("📈 Trade-off Sweep"):
+        st.caption("Solve these ingredients over a whole range of one limit or priority weight, "
+                   "and see how the fulfillment of every nutrient trades off.")
+        c1, c2, c3, c4 = st.columns(4)
+        with c1:
+            param = st.selectbox("Sweep:", list(SWEEP_LABELS), format_func=SWEEP_LABELS.get)
+        is_limit = param.startswith('limit_')
+        macro = param.split('_', 1)[1]
+        with c2:
+            low = st.number_input("From", min_value=0.01, key=f"sweep_low_{param}",
+                                  value=float(limits[macro]) * 0.5 if is_limit else 1.0)
+        with c3:
+            high = st.number_input("To", min_value=0.01, key=f"sweep_high_{param}",
+                                   value=float(limits[macro]) * 1.5 if is_limit else float(PRIORITY_WEIGHT))
+        with c4:
+            steps = st.slider("Points:", 5, 50, 15)
+
+        sweep_key = (data_version, tuple(foods), tuple(min_amounts.items()), tuple(limits.items()), priority_mode,
+                     SOLVER_BACKEND, param, low, high, steps)
+        clicked = st.button("Run Sweep 📈")
+        if not (clicked or memoized('optimizer_sweep', sweep_key) is not None):
+            return
+
+        def run_sweep():
+            # Limits are swept linearly, weights geometrically (1, ..., 100)
+            values = np.linspace(low, high, steps) if is_limit else np.geomspace(low, high, steps)
+            name_to_row, nutrients = table.lookup(foods)
+            result = sweep(foods, min_amounts, limits, priority_mode, name_to_row, nutrients, {param: values})
+
+            label = SWEEP_LABELS[param]
+            points = sorted(result.points, key=lambda p: p['params'][param])
+            curve_df = pd.DataFrame([
+                {label: p['params'][param], 'Nutrient': nutrient, 'Fulfillment(%)': pct}
+                for p in points
+                for nutrient, pct in zip(['Calories', 'Carbohydrate', 'Protein', 'Fat'], p['percentages'])
+            ])
+            with timed('chart_build_seconds', chart='optimizer_sweep'):
+                chart_sweep = alt.Chart(curve_df).mark_line(point=True).encode(
+                    x=alt.X(label, scale=alt.Scale(type='linear' if is_limit else 'log')),
+                    y=alt.Y('Fulfillment(%)', scale=alt.Scale(domain=[0, 100])),
+                    color='Nutrient',
+                    tooltip=[label, 'Nutrient', alt.Tooltip('Fulfillment(%)', format='.1f')]
+                ).properties(height=350)
+
+            portions_df = pd.DataFrame([p['x'] for p in points], columns=foods,
+                                       index=pd.Index([p['params'][param] for p in points], name=label))
+            portions_df['Solved'] = [p['success'] for p in points]
+            return result, chart_sweep, portions_df
+
+        try:
+            result, chart_sweep, portions_df = session_memo('optimizer_sweep', sweep_key, run_sweep)
+        except Exception as e:
+            st.error(f"Error: {e}")
+            return
+
+        st.caption(f"Solver: `{result.backend}` · {len(result.points)} warm-started solves in "
+                   f"{result.elapsed * 1000:.0f} ms ({result.elapsed * 1000 / len(result.points):.1f} ms each) · "
+                   f"{result.nit} iterations" + (f" · ⚠️ {result.failures} failed" if result.failures else ""))
+        st.altair_chart(chart_sweep, use_container_width=True)
+        st.dataframe(portions_df.style.format("{:.0f}", subset=foods), use_container_width=True)
@@ -0,0 +1,76 @@
+"""Menu 4: Similar Foods (nutritional substitutes)."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from calorhythm.loader import NUTRIENT_KEYS, NUTRIENT_UNITS
+from calorhythm.metrics import timed
+from calorhythm.resources import load_table, load_similar_index
+from calorhythm.views.widgets import food_search_select
+
+def render():
+    table = load_table()
+    cols_map = table.cols_map
+
+    st.header("🔄 Similar Foods (Substitutes)")
+    st.markdown("Find the foods **nutritionally closest** to one you pick, optionally lower or higher in chosen nutrients (Per 100g).")
+
+    if not len(table):
+        st.warning("Data not loaded.")
+        return
+
+    selected = food_search_select(
+        "Search a food to replace:",
+        key="similar_food",
+        placeholder="e.g., 라면, ㄹㅁ, ramyeon...",
+        max_selections=1,
+    )
+    if not selected:
+        st.info("👆 Please select a food first.")
+        return
+    food = selected[0]
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        lower_keys = st.multiselect("⬇️ Must be lower in:", NUTRIENT_KEYS, default=["Sodium"])
+    with c2:
+        higher_keys = st.multiselect("⬆️ Must be higher in:", [key for key in NUTRIENT_KEYS if key not in lower_keys])
+    with c3:
+        k = st.slider("📊 Result Count:", 3, 50, 10)
+
+    index = load_similar_index()
+    # The data may have been reloaded since the food was picked
+    if food not in index.position:
+        st.warning(f"⚠️ Not in the current data: {food}. Please select another food.")
+        return
+    reference = index.values[index.position[food]]
+    # Strictly lower / higher than the selected food
+    ranges = {}
+    for key in lower_keys:
+        ranges[key] = (None, np.nextafter(reference[NUTRIENT_KEYS.index(key)], -np.inf))
+    for key in higher_keys:
+        ranges[key] = (np.nextafter(reference[NUTRIENT_KEYS.index(key)], np.inf), None)
+
+    with timed('similar_query_seconds'):
+        matches = index.similar(food, k=k, ranges=ranges)
+
+    columns = [cols_map['Food Name']] + [cols_map[key] for key in NUTRIENT_KEYS]
+    reference_df = pd.DataFrame([[food, *reference]], columns=columns)
+    st.divider()
+    st.subheader("🎯 Selected Food")
+    st.dataframe(reference_df.round(2), use_container_width=True, hide_index=True)
+
+    st.subheader(f"✅ {len(matches)} Closest Substitutes")
+    if not matches:
+        st.warning("No food satisfies these constraints.")
+        return
+    names = [name for name, _ in matches]
+    df_match = pd.DataFrame(index.values[[index.position[name] for name in names]], columns=columns[1:])
+    df_match.insert(0, columns[0], names)
+    df_match['Distance'] = [distance for _, distance in matches]
+    df_match = df_match.round(2)
+    df_match.index = df_match.index + 1
+    st.dataframe(df_match, use_container_width=True)
+
+    units = ', '.join(f"{key} ({NUTRIENT_UNITS[key]})" for key in NUTRIENT_KEYS)
+    st.info(f"💡 **Tip**: Distance compares {units}, each measured in standard deviations across the whole table, so 0 means identical.")
@@ -0,0 +1,40 @@
+"""
+Per-session memoization for the pages.
+
+Each page is split into st.fragment sections, so moving a slider reruns only
+the section it belongs to. Within a section, session_memo keeps the last
+computed value (totals, solver output, chart spec) in st.session_state keyed
+by its inputs, so a rerun with unchanged inputs redraws it without recomputing.
+Only the latest value per name is kept, to bound session memory.
+"""
+import functools
+import streamlit as st
+
+from calorhythm.metrics import record_cache, timed
+
+def session_memo(name, key, compute):
+    """The value compute() returned for key, computed once per change of key in this session."""
+    slot = st.session_state.get(f'_memo_{name}')
+    hit = slot is not None and slot[0] == key
+    record_cache(f'session_{name}', hit)
+    if hit:
+        return slot[1]
+    value = compute()
+    st.session_state[f'_memo_{name}'] = (key, value)
+    return value
+
+def memoized(name, key):
+    """The value session_memo stored for key under name, or None."""
+    slot = st.session_state.get(f'_memo_{name}')
+    return slot[1] if slot is not None and slot[0] == key else None
+
+def fragment(name):
+    """st.fragment that also times each (partial) run as fragment_render_seconds."""
+    def decorate(render):
+        @st.fragment
+        @functools.wraps(render)
+        def run(*args, **kwargs):
+            with timed('fragment_render_seconds', fragment=name):
+                return render(*args, **kwargs)
+        return run
+    return decorate
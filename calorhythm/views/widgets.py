@@ -0,0 +1,34 @@
+"""Widgets shared by several pages."""
+import zlib
+import streamlit as st
+
+from calorhythm.resources import load_search_index, current_snapshot
+from calorhythm.views.state import session_memo
+
+# Number of matches sent to a food multiselect per query
+SEARCH_RESULT_LIMIT = 50
+
+def food_search_select(label, key, placeholder, max_selections=None, snapshot=None):
+    """
+    Search box plus multiselect whose options are only the top matches for the
+    query (and the foods already selected), instead of every name in the table.
+    Inside a fragment, pass the fragment's snapshot so matches come from the table it reads.
+
+    The selection is kept in st.session_state[key]. Streamlit releases before 1.53 include
+    a multiselect's options in its widget ID, so the widget key is derived from the options
+    and each new widget starts from the kept selection.
+    """
+    snapshot = snapshot or current_snapshot()
+    query = st.text_input(f"🔎 {label}", key=f"{key}_query", placeholder=placeholder)
+    selected = st.session_state.get(key, [])
+    matches = session_memo(f'search_{key}', (snapshot.version, query),
+                           lambda: load_search_index(snapshot).search(query, limit=SEARCH_RESULT_LIMIT))
+    options = list(dict.fromkeys(selected + matches))
+    widget_key = f"{key}_select_{zlib.crc32(chr(31).join(options).encode()):08x}"
+
+    def keep_selection():
+        st.session_state[key] = st.session_state[widget_key]
+
+    return st.multiselect("🥗 Selected:", options=options, default=selected, key=widget_key,
+                          on_change=keep_selection, max_selections=max_selections,
+                          placeholder="Type above, then pick from the matches")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the calorhythm package from the checkout, like benchmarks/run_benchmarks.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import pytest
+
+from calorhythm.batch import read_problems, solve_problem
+
+HEADER = "id,foods,min_amounts,limit_cal,priority_mode\n"
+
+def problems(tmp_path, rows):
+    path = tmp_path / 'problems.csv'
+    path.write_text(HEADER + rows, encoding='utf-8')
+    return list(read_problems(str(path)))
+
+def test_min_amounts_align_with_foods_by_position(tmp_path):
+    problem, = problems(tmp_path, "p1,A;B,;900,500,Balanced\n")
+    assert problem['min_amounts'] == {'A': 0.0, 'B': 900.0}
+    assert problem['limits'] == {'cal': 500.0}
+
+def test_missing_min_amounts_means_no_minimums(tmp_path):
+    problem, = problems(tmp_path, "p1,A;B,,,\n")
+    assert problem['min_amounts'] == {}
+    assert problem['priority_mode'] == 'Balanced'
+
+@pytest.mark.parametrize('mins', ["100", "100;200;300", "100;abc"])
+def test_bad_row_is_reported_without_stopping_the_batch(tmp_path, mins):
+    bad, good = problems(tmp_path, f"bad,A;B,{mins},,\ngood,A,50,,\n")
+    assert bad['id'] == 'bad' and bad['error'].startswith("Row 1: ")
+    assert good['min_amounts'] == {'A': 50.0}
+
+    record = solve_problem(bad)
+    assert record == {'id': 'bad', 'success': False, 'error': bad['error']}
+
+def test_bad_jsonl_line_is_reported_without_stopping_the_batch(tmp_path):
+    path = tmp_path / 'problems.jsonl'
+    path.write_text('{"id": "a", "foods": ["A"]}\n{"foods": [\n\n[1, 2]\n{"foods": ["B"]}\n', encoding='utf-8')
+    good, broken, listed, last = read_problems(str(path))
+    assert good == {'id': 'a', 'foods': ['A']}
+    assert broken['id'] == 1 and broken['error'].startswith("Line 2: ")
+    assert listed == {'id': 3, 'error': "Line 4: expected a JSON object, got list"}
+    assert last == {'id': 4, 'foods': ['B']}
+
+    record = solve_problem(listed)
+    assert record == {'id': 3, 'success': False, 'error': listed['error']}
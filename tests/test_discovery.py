@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calorhythm.loader import NUTRIENT_KEYS
+from calorhythm.store import FoodStore
+from calorhythm.database import SQLiteFoodTable, write_dataset
+from calorhythm.discovery import build_rank_index, order_by
+
+# One-decimal values like the RDA table's; most have no exact float32 representation
+VALUES = np.round(np.arange(0, 3, 0.1), 1)
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    cols_map = {key: key for key in ['Food Name'] + NUTRIENT_KEYS}
+    df = pd.DataFrame({key: rng.choice(VALUES, 200) for key in NUTRIENT_KEYS})
+    df.insert(0, 'Food Name', [f"food-{i}" for i in range(len(df))])
+    return df, cols_map
+
+def baseline_count(df, ranges):
+    """The pandas float64 mask the page used before the float32 store."""
+    mask = pd.Series(True, index=df.index)
+    for key, (low, high) in ranges.items():
+        if low is not None:
+            mask &= df[key] >= low
+        if high is not None:
+            mask &= df[key] <= high
+    return int(mask.sum())
+
+@pytest.mark.parametrize('ranges', [
+    {'Fat': (None, 0.1)},
+    {'Fat': (0.1, None)},
+    {'Protein': (0.3, 0.7)},
+    {'Protein': (1.1, None), 'Fat': (None, 0.1), 'Sodium': (0.2, 2.3)},
+    {'Sugar': (2.9, 2.9)},
+])
+def test_inclusive_bounds_keep_boundary_foods(table, ranges, tmp_path):
+    df, cols_map = table
+    expected = baseline_count(df, ranges)
+    assert expected > 0
+
+    count, _ = FoodStore(df, cols_map).filter(ranges, 'Energy', 10)
+    assert count == expected
+
+    db = str(tmp_path / 'foods.db')
+    write_dataset(df, cols_map, db, 'test')
+    count, _ = SQLiteFoodTable(db, 'test').filter(ranges, 'Energy', 10)
+    assert count == expected
+
+def test_top_k_matches_nlargest(table):
+    df, cols_map = table
+    rows = FoodStore(df, cols_map).top_k('Protein', 10, keys=['Protein'])
+    assert rows['Protein'].tolist() == df.nlargest(10, 'Protein')['Protein'].astype(np.float32).tolist()
+
+@pytest.mark.parametrize('largest', [True, False])
+@pytest.mark.parametrize('size', [0, 40, 150])  # Sparse and dense (over 1/3 of the table) matches
+def test_order_by_matches_a_stable_sort_of_the_matches(table, largest, size):
+    df, _ = table
+    rank_index = build_rank_index(df[NUTRIENT_KEYS].to_numpy(dtype=np.float32))
+    rows = np.random.default_rng(size).choice(len(df), size, replace=False)
+    expected = df.iloc[np.sort(rows)].sort_values('Protein', ascending=not largest, kind='stable').index
+    assert order_by(rank_index, 'Protein', rows, largest).tolist() == expected.tolist()
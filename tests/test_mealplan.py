@@ -0,0 +1,77 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calorhythm.loader import NUTRIENT_KEYS
+from calorhythm.mealplan import iter_plan_totals, read_plan, week_labels
+
+FOODS = ['rice', 'egg', 'chicken']
+NAME_TO_ROW = {food: i for i, food in enumerate(FOODS)}
+NUTRIENTS = np.arange(1, len(FOODS) * len(NUTRIENT_KEYS) + 1, dtype=np.float32).reshape(len(FOODS), -1)
+
+def lookup(foods):
+    return NAME_TO_ROW, NUTRIENTS
+
+def random_plan(rng, days):
+    entries = []
+    for day in range(1, days + 1):
+        for meal in rng.choice(['breakfast', 'lunch', 'dinner'], size=rng.integers(1, 4), replace=False):
+            for _ in range(rng.integers(1, 4)):
+                entries.append((str(day), meal, rng.choice(FOODS + ['unknown']), rng.choice([100.0, 250.0, np.nan])))
+    return pd.DataFrame(entries, columns=['day', 'meal', 'food', 'grams'])
+
+def aggregate(plan, chunksize):
+    batches = {'meal': [], 'day': [], 'week': []}
+    totals = iter_plan_totals((plan.iloc[i:i + chunksize] for i in range(0, len(plan), chunksize)), lookup)
+    while True:
+        try:
+            level, frame = next(totals)
+        except StopIteration as stop:
+            aggregator = stop.value
+            break
+        batches[level].append(frame)
+    frames = {level: pd.concat(frames, ignore_index=True) for level, frames in batches.items()}
+    return frames, aggregator
+
+@pytest.mark.parametrize('chunksize', [1, 2, 3, 7, 1000])
+def test_days_carried_across_chunks_match_one_chunk(chunksize):
+    plan = random_plan(np.random.default_rng(chunksize), days=16)
+    expected, whole = aggregate(plan, len(plan))
+    frames, chunked = aggregate(plan, chunksize)
+    for level in expected:
+        pd.testing.assert_frame_equal(frames[level], expected[level])
+    assert (chunked.entries, chunked.days, chunked.invalid, chunked.unknown) == \
+        (whole.entries, whole.days, whole.invalid, whole.unknown)
+
+def test_totals_and_deviations():
+    plan = pd.DataFrame({'day': ['1', '1', '1', '8'], 'meal': ['breakfast', 'breakfast', 'lunch', 'lunch'],
+                         'food': ['rice', 'egg', 'unknown', 'rice'], 'grams': [200.0, 50.0, 100.0, np.nan]})
+    frames, aggregator = aggregate(plan, 2)
+    expected = NUTRIENTS[0] * 2.0 + NUTRIENTS[1] * 0.5
+    np.testing.assert_allclose(frames['meal'][NUTRIENT_KEYS].to_numpy()[0], expected, rtol=1e-6)
+    assert frames['day']['day'].tolist() == ['1', '8']
+    assert frames['day']['meals'].tolist() == [2, 1]
+    assert frames['week'][['week', 'days']].values.tolist() == [['1', 1], ['2', 1]]
+    assert aggregator.unknown == {'unknown': 1} and aggregator.invalid == 1
+
+@pytest.mark.parametrize('chunksize', [1, 2, 10])
+def test_days_listed_out_of_order_are_rejected(chunksize):
+    plan = pd.DataFrame({'day': ['1', '2', '1'], 'meal': ['lunch'] * 3, 'food': ['rice'] * 3, 'grams': [100.0] * 3})
+    with pytest.raises(ValueError, match="contiguous"):
+        aggregate(plan, chunksize)
+
+def test_read_plan_keeps_day_labels_and_coerces_grams():
+    source = io.StringIO("day,meal,food,grams\n2024-03-04,,rice,abc\n2024-03-11,lunch,egg,50\n")
+    chunk, = read_plan(source)
+    assert chunk['day'].tolist() == ['2024-03-04', '2024-03-11']
+    assert chunk['meal'].tolist() == ['', 'lunch']
+    assert np.isnan(chunk['grams'].iloc[0])
+
+def test_week_labels():
+    assert week_labels(pd.Series(['1', '7', '8', '15'])).tolist() == ['1', '1', '2', '3']
+    assert week_labels(pd.Series(['2024-03-04', '2024-03-10', '2024-03-11'])).tolist() == \
+        ['2024-W10', '2024-W10', '2024-W11']
+    with pytest.raises(ValueError, match="neither"):
+        week_labels(pd.Series(['2024-03-04', 'someday']))
@@ -0,0 +1,20 @@
+import re
+
+from calorhythm.metrics import DESCRIPTIONS, MetricsRegistry
+
+def test_every_recorded_metric_is_exported():
+    registry = MetricsRegistry()
+    for name in DESCRIPTIONS:
+        registry.observe(name, 0.5, page='test')
+    registry.observe('not_yet_described_seconds', 1.0)
+    registry.inc('not_yet_described_total')
+
+    text = registry.prometheus_text()
+    for name in [*DESCRIPTIONS, 'not_yet_described_seconds', 'not_yet_described_total']:
+        if name != 'process_resident_memory_bytes':
+            assert re.search(rf'^# HELP calorhythm_{name} ', text, re.M), name
+
+def test_hot_path_metrics_are_described():
+    for name in ['similar_query_seconds', 'selection_search_seconds', 'sweep_seconds',
+                 'fragment_render_seconds', 'mealplan_chunk_seconds']:
+        assert name in DESCRIPTIONS
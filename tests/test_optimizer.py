@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from calorhythm.optimizer import DEFAULT_LIMITS, MACROS, PRIORITY_MODES, priority_weights, solve_portions
+
+LIMITS = [DEFAULT_LIMITS[m] for m in MACROS]
+
+def random_problem(rng, k):
+    """Per-gram (cal, carb, prot, fat) rows with the energy of real foods, and limits around the defaults."""
+    carb, prot, fat = rng.gamma(1.2, 0.15, k), rng.gamma(1.1, 0.08, k), rng.gamma(0.8, 0.07, k)
+    A = np.vstack([4 * carb + 4 * prot + 9 * fat, carb, prot, fat])
+    limits = [limit * rng.uniform(0.5, 1.5) for limit in LIMITS]
+    weights = priority_weights(PRIORITY_MODES[rng.integers(len(PRIORITY_MODES))])
+    return A, limits, [weights[m] for m in MACROS]
+
+@pytest.mark.parametrize('k', [2, 3, 5, 10, 50])
+def test_bvls_solves_every_feasible_problem(k):
+    rng = np.random.default_rng(k)
+    for _ in range(30):
+        A, limits, weights = random_problem(rng, k)
+        slsqp = solve_portions(A, limits, weights, np.zeros(k), backend='slsqp')
+        bvls = solve_portions(A, limits, weights, np.zeros(k), backend='bvls')
+        assert bvls.success, bvls.message
+        assert np.all(A @ bvls.x <= np.array(limits) * (1 + 1e-9))
+        if slsqp.success:
+            assert bvls.fun <= slsqp.fun * (1 + 1e-3) + 1e-6
+
+def test_bvls_inner_solve_runs_to_convergence():
+    # lsq_linear's default BVLS cap (n iterations) stopped short here, giving a wrong dual bound
+    A = np.array([[0.66, 0.31, 3.59], [0.177, 0.038, 0.777], [0.004, 0.038, 0.066], [0.001, 0.009, 0.008]])
+    limits = [293.248, 68.825, 20.932, 13.841]
+    result = solve_portions(A, limits, [1, 100, 1, 1], np.zeros(3), backend='bvls')
+    assert result.success
+    assert result.fun == pytest.approx(0.94148, rel=1e-3)
+
+def test_bvls_warm_start_reaches_the_same_solution():
+    rng = np.random.default_rng(0)
+    A, limits, weights = random_problem(rng, 5)
+    cold = solve_portions(A, limits, weights, np.zeros(5), backend='bvls')
+    warm = solve_portions(A, [limit * 1.05 for limit in limits], weights, np.zeros(5), backend='bvls',
+                          warm_start=cold.warm_state)
+    again = solve_portions(A, [limit * 1.05 for limit in limits], weights, np.zeros(5), backend='bvls')
+    assert warm.success and warm.fun == pytest.approx(again.fun, rel=1e-4, abs=1e-8)
+
+def test_bvls_reports_minimums_only_when_they_are_set():
+    A = np.array([[4.0, 9.0], [1.0, 0.0], [0.0, 0.2], [0.0, 1.0]])
+    result = solve_portions(A, LIMITS, [1, 1, 1, 1], [300.0, 0.0], backend='bvls')
+    assert not result.success
+    assert result.message == 'Limits cannot be met with the minimum intakes.'
+
+    # A zero limit without minimums is feasible (x = 0 on that food)
+    result = solve_portions(A, [500.0, 60.0, 30.0, 0.0], [1, 1, 1, 1], [0.0, 0.0], backend='bvls')
+    assert result.success and 'minimum' not in result.message
@@ -0,0 +1,20 @@
+from calorhythm.search import FoodSearchIndex
+
+NAMES = ['바비큐 소스', '초밥', '즉석밥', '밥솥 누룽지', '닭가슴살, 생것', '귀리, 겉귀리, 도정, 밥', '닭고기, 다리, 생것']
+
+def test_exact_spelling_outranks_alternate_prefix():
+    # '밥' can be the IME's intermediate form of '바' + 'ㅂ...', which makes '바비큐' a prefix match
+    results = FoodSearchIndex(NAMES).search('밥')
+    assert results.index('초밥') < results.index('바비큐 소스')
+    assert results.index('즉석밥') < results.index('바비큐 소스')
+    assert results[0] == '밥솥 누룽지'
+
+def test_partial_syllables_initials_and_romanization():
+    index = FoodSearchIndex(NAMES)
+    assert index.search('닭가스')[0] == '닭가슴살, 생것'
+    assert index.search('ㄷㄱㅅㅅ')[0] == '닭가슴살, 생것'
+    assert index.search('dakgaseum')[0] == '닭가슴살, 생것'
+
+def test_every_term_must_match():
+    assert FoodSearchIndex(NAMES).search('귀리 밥') == ['귀리, 겉귀리, 도정, 밥']
+    assert FoodSearchIndex(NAMES).search('귀리 닭') == []